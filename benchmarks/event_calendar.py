@@ -0,0 +1,76 @@
+"""
+Hold-model microbenchmark of the event calendar backends.
+
+The calendar is filled with `depth` events and then `ops` hold operations
+(pop the next event, push a new one a random delay later) are timed, so the
+queue depth stays constant during the measure.
+
+    python -m benchmarks.event_calendar --depths 10 100 1000 10000
+"""
+import argparse
+import random
+import time
+
+from src.events.base import Event
+from src.events.calendar import CALENDARS
+
+
+class SortThenPopCalendar:
+    """The former Simulation.run loop: sort the list, then pop(0)."""
+
+    def __init__(self):
+        self.events = []
+
+    def push(self, event):
+        self.events.append(event)
+
+    def pop(self):
+        self.events.sort()
+        return self.events.pop(0)
+
+
+BACKENDS = {'sort-pop': SortThenPopCalendar, **CALENDARS}
+
+
+def hold(calendar_class, depth, ops, seed=0):
+    rnd = random.Random(seed)
+    calendar = calendar_class()
+
+    for _ in range(depth):
+        calendar.push(Event(rnd.expovariate(1)))
+
+    start = time.perf_counter()
+    for _ in range(ops):
+        event = calendar.pop()
+        calendar.push(Event(event.time + rnd.expovariate(1)))
+
+    return ops / (time.perf_counter() - start)
+
+
+def run(depths, ops, backends=BACKENDS, max_sort_depth=1000):
+    results = []
+    for depth in depths:
+        for name, calendar_class in backends.items():
+            if name == 'sort-pop' and depth > max_sort_depth:
+                continue
+
+            results.append({
+                'backend': name,
+                'depth': depth,
+                'ops_per_sec': hold(calendar_class, depth, ops),
+            })
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depths", type=int, nargs='+',
+                        default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument("--ops", type=int, default=20000)
+
+    args = parser.parse_args()
+
+    for result in run(args.depths, args.ops):
+        print(f"{result['backend']:>10} depth={result['depth']:<8} "
+              f"{result['ops_per_sec']:>12,.0f} hold/s")
@@ -0,0 +1,149 @@
+"""
+Event construction and dispatch, before and after the handler table.
+
+`singledispatch` is the former path: events built with a setattr loop over
+keyword arguments and dispatched by a functools.singledispatchmethod,
+`table` is the current one: __slots__ events and a list of bound handlers
+indexed by Event.kind. The handlers do nothing, so only the dispatch is
+measured. The events/sec of Simulation.run are given for reference.
+
+    python -m benchmarks.event_dispatch --events 200000
+"""
+import argparse
+import random
+import time
+from functools import singledispatchmethod
+
+from src.events.base import EventKind
+from src.events.client_arrive import ClientArriveEvent
+from src.events.client_leave_totem import ClientLeaveTotemEvent
+from src.events.client_leave import ClientLeave
+from src.events.space_in_waiting_room import FeeSpaceInWaitingRoomEvent
+from src.events.client_leakage import ClientLeakageEvent
+from src.events.worker_return_to_work import WorkerReturnToWork
+
+from benchmarks.suite import events_per_sec
+
+
+class KwargsEvent:
+    """The former Event base class"""
+
+    def __init__(self, time, **kwargs):
+        self.time = time
+
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+class KwargsClientLeave(KwargsEvent):
+    def __init__(self, time, client, worker, **kwargs):
+        super().__init__(time, **kwargs)
+        self.client = client
+        self.worker = worker
+
+
+EVENTS = (
+    ClientArriveEvent(0, None),
+    ClientLeaveTotemEvent(0, None),
+    ClientLeave(0, None, None),
+    FeeSpaceInWaitingRoomEvent(0),
+    ClientLeakageEvent(0, None, False),
+    WorkerReturnToWork(0, None),
+)
+
+
+class SingleDispatch:
+    @singledispatchmethod
+    def run_event(self):
+        pass
+
+    @run_event.register
+    def _(self, event: ClientArriveEvent):
+        pass
+
+    @run_event.register
+    def _(self, event: ClientLeaveTotemEvent):
+        pass
+
+    @run_event.register
+    def _(self, event: ClientLeave):
+        pass
+
+    @run_event.register
+    def _(self, event: FeeSpaceInWaitingRoomEvent):
+        pass
+
+    @run_event.register
+    def _(self, event: ClientLeakageEvent):
+        pass
+
+    @run_event.register
+    def _(self, event: WorkerReturnToWork):
+        pass
+
+
+class Table:
+    def __init__(self):
+        self.handlers = [self.handle] * EventKind.COUNT
+
+    def handle(self, event):
+        pass
+
+
+def rate(f, events):
+    start = time.perf_counter()
+    f(events)
+    return len(events) / (time.perf_counter() - start)
+
+
+def run(events, replications=10):
+    rnd = random.Random(0)
+    stream = [rnd.choice(EVENTS) for _ in range(events)]
+
+    singledispatch = SingleDispatch()
+    table = Table()
+
+    def dispatch_singledispatch(stream):
+        for event in stream:
+            singledispatch.run_event(event)
+
+    def dispatch_table(stream):
+        handlers = table.handlers
+        for event in stream:
+            handlers[event.kind](event)
+
+    def construct_kwargs(stream):
+        for _ in stream:
+            KwargsClientLeave(0.0, None, None)
+
+    def construct_slots(stream):
+        for _ in stream:
+            ClientLeave(0.0, None, None)
+
+    return {
+        "dispatch": {
+            "singledispatch": rate(dispatch_singledispatch, stream),
+            "table": rate(dispatch_table, stream),
+        },
+        "construct": {
+            "singledispatch": rate(construct_kwargs, stream),
+            "table": rate(construct_slots, stream),
+        },
+        "simulation": events_per_sec(replications)["simulation.events_per_sec"][0],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--replications", type=int, default=10)
+
+    args = parser.parse_args()
+
+    results = run(args.events, args.replications)
+    for name in ("dispatch", "construct"):
+        before, after = results[name]["singledispatch"], results[name]["table"]
+        print(f"{name:>10} singledispatch {before:>12,.0f}/s  table {after:>12,.0f}/s"
+              f"  x{after / before:.1f}")
+
+    print(f"{'simulation':>10} {results['simulation']:>12,.0f} events/s")
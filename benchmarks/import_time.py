@@ -0,0 +1,56 @@
+"""
+Import time of the engine, before and after the lazy imports.
+
+`eager` imports pandas and scipy.stats with each module, as the engine did
+when simulation.py, the sinks and the runners imported them at the top,
+`lazy` is the module alone. The third-party modules each import loads are
+listed, the core engine only loads NumPy.
+
+    python -m benchmarks.import_time --repeat 5
+"""
+import argparse
+import subprocess
+import sys
+
+from benchmarks.suite import IMPORTS, timed
+
+HEAVY = ('pandas', 'scipy', 'pyarrow', 'tqdm')
+
+
+def loaded(module):
+    """The HEAVY modules loaded by importing `module`"""
+    code = (
+        f"import sys, {module}; "
+        f"print(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], check=True, capture_output=True, text=True
+    )
+    return output.stdout.split()
+
+
+def run(repeat=5):
+    def python(code):
+        return lambda: subprocess.run([sys.executable, '-c', code], check=True)
+
+    startup = timed(python('pass'), repeat)
+    return {
+        module: {
+            "eager": timed(python(f'import pandas, scipy.stats, {module}'), repeat) - startup,
+            "lazy": timed(python(f'import {module}'), repeat) - startup,
+            "loaded": loaded(module),
+        }
+        for module in IMPORTS
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args()
+
+    for module, result in run(args.repeat).items():
+        before, after = result["eager"], result["lazy"]
+        print(f"{module:>22} eager {before * 1000:>7.0f}ms  lazy {after * 1000:>7.0f}ms"
+              f"  x{before / after:.1f}  loads: {', '.join(result['loaded']) or '-'}")
@@ -0,0 +1,86 @@
+"""
+Draws/sec of every RandomVar subclass, before and after the variate buffers.
+
+`scipy` is the former path, one `stats.<dist>.rvs(..., size=1)[0]` call per
+variate, `buffered` is RandomVar.generate.
+
+    python -m benchmarks.random_vars --draws 100000 --block-size 1024
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy import stats
+
+from src.random_vars.base import ExponentialRandomVar
+from src.random_vars.base import Chi2RandomVar
+from src.random_vars.base import UniformRandomVar
+from src.random_vars.base import LogNormRandomVar
+from src.random_vars.base import MultiModalRandomVar
+from src.random_vars.base import ConstantRandomVar
+
+
+def cases(block_size=None):
+    weights = [0.20, 0.30, 0.50]
+    selection_dist = stats.rv_discrete(values=(range(len(weights)), weights))
+
+    return {
+        'ExponentialRandomVar': (
+            ExponentialRandomVar(0, 1/25, block_size=block_size),
+            lambda: stats.expon.rvs(0, 1/25, size=1)[0]
+        ),
+        'Chi2RandomVar': (
+            Chi2RandomVar(3, block_size=block_size),
+            lambda: stats.chi2.rvs(3, size=1)[0]
+        ),
+        'UniformRandomVar': (
+            UniformRandomVar(12, 13, block_size=block_size),
+            lambda: stats.uniform.rvs(12, 13, size=1)[0]
+        ),
+        'LogNormRandomVar': (
+            LogNormRandomVar(0.47, 0, np.exp(11.35), block_size=block_size),
+            lambda: stats.lognorm.rvs(0.47, 0, np.exp(11.35), size=1)[0]
+        ),
+        'MultiModalRandomVar': (
+            MultiModalRandomVar(weights, block_size=block_size),
+            lambda: selection_dist.rvs() + 1
+        ),
+        'ConstantRandomVar': (
+            ConstantRandomVar(0),
+            lambda: 0
+        ),
+    }
+
+
+def rate(draw, draws):
+    start = time.perf_counter()
+    for _ in range(draws):
+        draw()
+
+    return draws / (time.perf_counter() - start)
+
+
+def run(draws, block_size=None, scipy_draws=None):
+    results = []
+    for name, (rvar, scipy_draw) in cases(block_size).items():
+        results.append({
+            'variable': name,
+            'scipy': rate(scipy_draw, scipy_draws or draws),
+            'buffered': rate(rvar.generate, draws),
+        })
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--draws", type=int, default=100000)
+    parser.add_argument("--scipy-draws", type=int, default=10000)
+    parser.add_argument("--block-size", type=int, default=None)
+
+    args = parser.parse_args()
+
+    for result in run(args.draws, args.block_size, args.scipy_draws):
+        print(f"{result['variable']:>22} scipy {result['scipy']:>12,.0f} draws/s"
+              f"  buffered {result['buffered']:>12,.0f} draws/s"
+              f"  x{result['buffered'] / result['scipy']:.0f}")
@@ -0,0 +1,282 @@
+"""
+Benchmark suite of the simulation engine and the KPI pipeline.
+
+`run` measures, and saves as JSON:
+
+  - scenario.<name>.seconds      wall time of one replication of each
+                                 run.py scenario
+  - simulation.events_per_sec    events/sec of Simulation.run
+  - draws.<RandomVar>            draws/sec of each RandomVar subclass
+  - kpis.read_data.files_per_sec kpis.read_data throughput per CSV file
+  - kpis.aux.files_per_sec       kpis._aux throughput per CSV file
+  - pool.<p>.replications_per_sec
+                                 replications/sec with p processes
+  - import.<module>.seconds      import time of the engine modules in a
+                                 fresh interpreter
+
+`compare` reads two result files and exits with status 1 if any benchmark
+is slower than the baseline by more than `--threshold`.
+
+    python -m benchmarks.suite run --output benchmarks/results.json
+    python -m benchmarks.suite compare baseline.json benchmarks/results.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.random_vars import cases, rate
+from src.entities.totem import Totem
+from src.metrics.profiler import SimulationProfiler
+from src.random_vars import client as ClientRandomVar
+from src.random_vars.base import GeometricRandomVar
+from src.results.sinks import CSVSink
+from src.runner.scheduler import ReplicationScheduler, available_cpus
+from src.simulation import Simulation
+
+# run.py and kpis.py live at the repository root, run from there
+import run as simulations
+import kpis as kpi_pipeline
+
+
+SEED = 123456
+
+# Modules imported by every process of a pool, and the run.py entry point
+IMPORTS = ('src.simulation', 'src.runner.scheduler', 'run')
+
+
+def timed(f, repeat):
+    """Best wall time of `repeat` calls of f"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def replicate(workers, replication, profiler=None):
+    ClientRandomVar.seed(SEED, replication)
+    return Simulation(
+        waiting_room_size=20,
+        totem=Totem(),
+        workers=workers,
+        keep_clients=False,
+        profiler=profiler
+    ).start().run()
+
+
+#####################################################################
+# Benchmarks
+####################################################################
+
+def scenarios(repeat):
+    return {
+        f"scenario.{name}.seconds": (
+            timed(lambda: replicate(workers, 0), repeat), "s", False
+        )
+        for name, workers in simulations.options.items()
+    }
+
+
+def events_per_sec(replications):
+    workers = simulations.options['clients']
+
+    # Replications are deterministic, so the events are counted once with a
+    # profiler and the runs timed without it
+    profiler = SimulationProfiler()
+    for i in range(replications):
+        replicate(workers, i, profiler)
+    events = sum(profiler.events.values())
+
+    start = time.perf_counter()
+    for i in range(replications):
+        replicate(workers, i)
+
+    return {
+        "simulation.events_per_sec": (
+            events / (time.perf_counter() - start), "events/s", True
+        )
+    }
+
+
+def draws_per_sec(draws):
+    variables = {name: rvar for name, (rvar, _) in cases().items()}
+    variables['GeometricRandomVar'] = GeometricRandomVar(0.01)
+
+    results = {}
+    for name, rvar in variables.items():
+        rvar.seed(SEED)
+        draw = rvar.sample if isinstance(rvar, GeometricRandomVar) else rvar.generate
+        results[f"draws.{name}"] = (rate(draw, draws), "draws/s", True)
+
+    return results
+
+
+def kpis_per_file(files):
+    workers = simulations.options['clients']
+
+    with tempfile.TemporaryDirectory() as path:
+        with CSVSink(path, 'benchmark', SEED) as sink:
+            for i in range(files):
+                sink.write(simulations.run(i, workers, seed=SEED))
+
+        directory = os.path.join(path, 'benchmark')
+        names = sorted(os.listdir(directory))
+
+        start = time.perf_counter()
+        for name in names:
+            kpi_pipeline.read_data(os.path.join(directory, name))
+        read_data = len(names) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for name in names:
+            kpi_pipeline._aux(name, directory)
+        aux = len(names) / (time.perf_counter() - start)
+
+    return {
+        "kpis.read_data.files_per_sec": (read_data, "files/s", True),
+        "kpis.aux.files_per_sec": (aux, "files/s", True),
+    }
+
+
+def pool(replications, processes, chunk_size):
+    results = {}
+    for p in processes:
+        with ReplicationScheduler(
+            simulations.options['clients'],
+            kpis=True,
+            chunk_size=chunk_size,
+            processes=p,
+            seed=SEED
+        ) as scheduler:
+            start = time.perf_counter()
+            for _ in scheduler.run(replications):
+                pass
+            elapsed = time.perf_counter() - start
+
+        results[f"pool.{p}.replications_per_sec"] = (
+            replications / elapsed, "replications/s", True
+        )
+
+    return results
+
+
+def import_time(repeat, modules=IMPORTS):
+    """Import time of each module in a fresh interpreter, its startup left out"""
+    def python(code):
+        return lambda: subprocess.run([sys.executable, '-c', code], check=True)
+
+    startup = timed(python('pass'), repeat)
+    return {
+        f"import.{module}.seconds": (
+            timed(python(f'import {module}'), repeat) - startup, "s", False
+        )
+        for module in modules
+    }
+
+
+def run(repeat=3, replications=20, draws=200000, files=20, pool_replications=100,
+        processes=None, chunk_size=10):
+    results = {}
+    for name, benchmark in (
+        ("scenarios", lambda: scenarios(repeat)),
+        ("events", lambda: events_per_sec(replications)),
+        ("draws", lambda: draws_per_sec(draws)),
+        ("kpis", lambda: kpis_per_file(files)),
+        ("pool", lambda: pool(
+            pool_replications, processes or range(1, available_cpus() + 1), chunk_size
+        )),
+        ("imports", lambda: import_time(repeat)),
+    ):
+        print(f"{name}...", file=sys.stderr)
+        results.update(benchmark())
+
+    return {
+        "meta": {
+            "time": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpus": available_cpus(),
+        },
+        "results": {
+            name: {"value": value, "unit": unit, "higher_is_better": higher}
+            for name, (value, unit, higher) in results.items()
+        },
+    }
+
+
+#####################################################################
+# Comparison
+####################################################################
+
+def compare(baseline, current, threshold=0.1):
+    """
+    (name, baseline, current, slowdown, slower) per benchmark of both files,
+    slowdown being relative, positive when `current` is slower.
+    """
+    rows = []
+    for name, base in baseline["results"].items():
+        if name not in current["results"]:
+            continue
+
+        a, b = base["value"], current["results"][name]["value"]
+        slowdown = (a - b) / a if base["higher_is_better"] else (b - a) / a
+        rows.append((name, a, b, slowdown, slowdown > threshold))
+
+    return rows
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--output", default="benchmarks/results.json")
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--replications", type=int, default=20)
+    run_parser.add_argument("--draws", type=int, default=200000)
+    run_parser.add_argument("--files", type=int, default=20)
+    run_parser.add_argument("--pool-replications", type=int, default=100)
+    run_parser.add_argument("--processes", type=int, nargs='+', default=None)
+    run_parser.add_argument("--chunk-size", type=int, default=10)
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="relative slowdown that fails the comparison")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run(
+            args.repeat, args.replications, args.draws, args.files,
+            args.pool_replications, args.processes, args.chunk_size
+        )
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+        for name, result in results["results"].items():
+            print(f"{name:>45} {result['value']:>14,.4g} {result['unit']}")
+
+    else:
+        rows = compare(load(args.baseline), load(args.current), args.threshold)
+        for name, a, b, slowdown, slower in rows:
+            print(f"{'SLOWER' if slower else 'ok':>6} {name:>45} "
+                  f"{a:>12,.4g} -> {b:>12,.4g} ({(b - a) / a:+.1%})")
+
+        sys.exit(1 if any(slower for *_, slower in rows) else 0)
@@ -0,0 +1,108 @@
+"""
+Cost of tracing Simulation.run, in events/sec.
+
+`off` runs without a trace, `binary` and `ndjson` write a TraceRecorder
+file, and `former` builds and prints the text view of every event as the
+former verbose mode did, to os.devnull and without the delay.
+
+    python -m benchmarks.trace --replications 20
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from src.entities.totem import Totem
+from src.metrics.profiler import SimulationProfiler
+from src.metrics.trace import TraceRecorder, TraceFormat
+from src.random_vars import client as ClientRandomVar
+from src.simulation import Simulation
+
+from benchmarks.suite import SEED
+
+import run as simulations
+
+
+class FormerVerbose:
+    """The former verbose output, as a trace"""
+
+    def __init__(self, file):
+        self.file = file
+
+    def begin(self, simulation):
+        pass
+
+    def end(self, simulation):
+        pass
+
+    def record(self, s, event):
+        output = f"Clock: {s.clock} --> {event}\n"
+        output += f"Waiting Room ({len(s.waiting_room)}/{s.waiting_room_size}): {[str(client) for client in s.waiting_room]}\n"
+        output += f"Totem Waiting Room ({len(s.totem_waiting_list)}): {'I'* len(s.totem_waiting_list)}\n"
+        output += ''.join([
+            f"Monitor Worker({i}): {[str(client) if client else 'Empty' for client in worker.queue]}\n"
+            for i, worker in enumerate(s.workers)
+        ])
+        output += f"Events Queue: {[str(event) for event in s.events]}\n"
+        output += "---------------------------------------------------------------------------------------------------------"
+
+        print(output, file=self.file)
+
+
+def replicate(replication, trace=None, profiler=None):
+    ClientRandomVar.seed(SEED, replication)
+    return Simulation(
+        waiting_room_size=20,
+        totem=Totem(),
+        workers=simulations.options['clients'],
+        keep_clients=False,
+        profiler=profiler,
+        trace=trace
+    ).start().run()
+
+
+def rate(replications, trace=None):
+    start = time.perf_counter()
+    for i in range(replications):
+        if trace is not None and hasattr(trace, 'simulation'):
+            trace.simulation = i
+        replicate(i, trace)
+
+    return time.perf_counter() - start
+
+
+def run(replications=20):
+    profiler = SimulationProfiler()
+    for i in range(replications):
+        replicate(i, profiler=profiler)
+    events = sum(profiler.events.values())
+
+    with tempfile.TemporaryDirectory() as path, open(os.devnull, 'w') as devnull:
+        seconds = {
+            "off": rate(replications),
+            "binary": rate(replications, TraceRecorder(os.path.join(path, 'trace.bin'))),
+            "ndjson": rate(replications, TraceRecorder(
+                os.path.join(path, 'trace.ndjson'), TraceFormat.NDJSON
+            )),
+            "former": rate(replications, FormerVerbose(devnull)),
+        }
+        size = {
+            name: os.path.getsize(os.path.join(path, f'trace.{name}'))
+            for name in ("bin", "ndjson")
+        }
+
+    return events, {name: events / s for name, s in seconds.items()}, size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--replications", type=int, default=20)
+
+    args = parser.parse_args()
+
+    events, rates, size = run(args.replications)
+    for name, value in rates.items():
+        print(f"{name:>8} {value:>12,.0f} events/s  x{value / rates['off']:.2f}")
+
+    print(f"{events} events, {size['bin'] / events:.0f} bytes/event binary, "
+          f"{size['ndjson'] / events:.0f} bytes/event ndjson")
@@ -1,5 +1,5 @@
 import os
-import sys
+import argparse
 import pandas as pd
 import numpy as np
 from scipy import stats
@@ -7,10 +7,15 @@ from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 
+from src.results.sinks import iter_results
+from src.metrics.profiler import SimulationProfiler
+
 
 def read_data(path):
-    df = pd.read_csv(path)
+    return prepare_data(pd.read_csv(path))
+
 
+def prepare_data(df):
     df['leakage'] = df['leave_time'].isna()
 
     df['attention_time'] = np.where(
@@ -84,22 +89,103 @@ def worker_kpis(df, worker):
     }
 
 
+def compute_kpis(df):
+    return {
+        **global_kpis(df),
+        **clients_kpis(df, 'A'),
+        **clients_kpis(df, 'B'),
+        **clients_kpis(df, 'C'),
+        **worker_kpis(df, 0.0),
+        **worker_kpis(df, 1.0),
+        **worker_kpis(df, 2.0),
+        **worker_kpis(df, 3.0),
+    }
+
+
+TYPES = ('A', 'B', 'C')
+WORKERS = (0.0, 1.0, 2.0, 3.0)
+
+
+def bulk_kpis(df):
+    """
+    compute_kpis of every simulation in df at once, one row per simulation,
+    with one groupby per dimension instead of a boolean mask per KPI.
+    """
+    by_simulation = df.groupby('simulation')
+    simulations = by_simulation.size()
+
+    def leakage_in(data):
+        grouped = data.groupby('simulation')['leakage']
+        return (grouped.sum() / grouped.size() * 100).reindex(simulations.index)
+
+    kpis = pd.DataFrame({
+        "total de clientes fugados": by_simulation['leakage'].sum() / simulations * 100,
+        "total de clientes fugados en la mañana": leakage_in(df[df['arrive_time'] < 12]),
+        "total de clientes fugados al medio día": leakage_in(
+            df[(df['arrive_time'] >= 12) & (df['arrive_time'] < 14)]
+        ),
+        "total de clientes fugados en la tarde": leakage_in(df[df['arrive_time'] > 14]),
+        "total de ingresos": by_simulation['price'].sum(),
+    })
+
+    def per_type(grouped):
+        return (grouped.sum() / grouped.size() * 100).unstack('type').reindex(
+            index=simulations.index, columns=TYPES
+        )
+
+    by_type = df.groupby(['simulation', 'type'])
+    leakage = per_type(by_type['leakage'])
+    system_time = per_type(by_type['system_time'])
+    waiting_time = per_type(
+        df[~df['waiting_time'].isna()].groupby(['simulation', 'type'])['waiting_time']
+    )
+
+    for client_type in TYPES:
+        kpis[f"total de clientes de tipo {client_type} fugados"] = leakage[client_type]
+        kpis[f"Tiempo promedio en el sistema clientes tipo {client_type}"] = system_time[client_type]
+        kpis[f"Tiempo promedio en la sala de espera clientes tipo {client_type}"] = waiting_time[client_type]
+
+    by_worker = df.groupby(['simulation', 'worker_helper'])
+    worker_time = (by_worker['attention_time'].sum() / (18-9-1) * 100).unstack(
+        'worker_helper'
+    ).reindex(index=simulations.index, columns=WORKERS).fillna(0)
+    worker_clients = by_worker.size().unstack('worker_helper').reindex(
+        index=simulations.index, columns=WORKERS
+    ).fillna(0).div(simulations, axis=0) * 100
+
+    for worker in WORKERS:
+        kpis[f"Porcentaje de tiempo de trabajo el modulo {worker} empleado en la atención de clientes"] = worker_time[worker]
+        kpis[f"Porciento de clientes atendidos por el modulo {worker}"] = worker_clients[worker]
+
+    return kpis
+
+
+def chunked_kpis(chunks):
+    """bulk_kpis over chunks of whole simulations, never all of them in memory"""
+    return pd.concat([bulk_kpis(prepare_data(df)) for df in chunks])
+
+
+def csv_chunks(directory, files_per_chunk=2000):
+    files = sorted(
+        os.path.join(directory, filename)
+        for filename in os.listdir(directory) if filename.endswith('.csv')
+    )
+
+    with ThreadPoolExecutor() as pool:
+        for i in range(0, len(files), files_per_chunk):
+            yield pd.concat(
+                pool.map(pd.read_csv, files[i:i + files_per_chunk]),
+                ignore_index=True
+            )
+
+
 def _aux(filename, directory):
     try:
         if filename.endswith('.csv'):
             file_path = os.path.join(directory, filename)
             df = read_data(file_path)
 
-            return {
-                **global_kpis(df),
-                **clients_kpis(df, 'A'),
-                **clients_kpis(df, 'B'),
-                **clients_kpis(df, 'C'),
-                **worker_kpis(df, 0.0),
-                **worker_kpis(df, 1.0),
-                **worker_kpis(df, 2.0),
-                **worker_kpis(df, 3.0),
-            }
+            return compute_kpis(df)
     except:
         return None
 
@@ -118,14 +204,40 @@ def pandas_process_csv_files(directory):
     return pd.DataFrame(kpis)
 
 
-if __name__ == '__main__':
+def store_kpis(path, scenario, seed=None):
+    return chunked_kpis(tqdm(iter_results(path, scenario, seed)))
 
-    if len(sys.argv) != 2:
-        raise Exception(sys.argv)
 
-    client_type = sys.argv[-1]
-    kpis = pandas_process_csv_files(f'./{client_type}')
-    kpis.to_csv(f'./notebooks/{client_type}.csv')
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("client_type")
+    parser.add_argument("--store", default=None,
+                        help="columnar store written by run.py --sink npz/parquet")
+    parser.add_argument("--per-file", action='store_true',
+                        help="compute the KPIs of each CSV file on its own")
+    parser.add_argument("--files-per-chunk", type=int, default=2000)
+    parser.add_argument("--profile", nargs='?', const='', default=None,
+                        help="print the profile written by run.py --profile, "
+                             "./notebooks/{client_type}_profile.json by default")
+
+    args = parser.parse_args()
+
+    client_type = args.client_type
+    if args.profile is not None:
+        # Only prints the profile, the KPIs are left as they are
+        print(SimulationProfiler.load(
+            args.profile or f'./notebooks/{client_type}_profile.json'
+        ).format())
+
+    else:
+        if args.store is None and args.per_file:
+            kpis = pandas_process_csv_files(f'./{client_type}')
+        elif args.store is None:
+            kpis = chunked_kpis(tqdm(csv_chunks(f'./{client_type}', args.files_per_chunk)))
+        else:
+            kpis = store_kpis(args.store, client_type)
+
+        kpis.to_csv(f'./notebooks/{client_type}.csv')
 
     # kpis = pandas_process_csv_files('./clients_plus_cs')
     # kpis.to_csv('./notebooks/clients_plus_cs.csv')
@@ -1,34 +1,47 @@
+# --resume: a run interrupted before its rm -r goes on from the ranges in
+# ./{scenario}/manifest.jsonl instead of starting over. The manifest lives
+# with the CSV files, so rm -r drops it and the next run starts fresh
+
 # echo "clients"
-# python run.py clients
+# python run.py clients --resume
 # python kpis.py clients
 # rm -r clients
 
 # echo "clients_plus_cs"
-# python run.py clients_plus_cs
+# python run.py clients_plus_cs --resume
 # python kpis.py clients_plus_cs
 # rm -r clients_plus_cs
 
 # echo "clients_plus_seller"
-# python run.py clients_plus_seller
+# python run.py clients_plus_seller --resume
 # python kpis.py clients_plus_seller
 # rm -r clients_plus_seller
 
 # echo "clients_seller_and_cs"
-# python run.py clients_seller_and_cs
+# python run.py clients_seller_and_cs --resume
 # python kpis.py clients_seller_and_cs
 # rm -r clients_seller_and_cs
 
 echo "clients_q_1"
-python run.py clients_q_1
+python run.py clients_q_1 --resume
 python kpis.py clients_q_1
 rm -r clients_q_1
 
 echo "clients_q_0"
-python run.py clients_q_0
+python run.py clients_q_0 --resume
 python kpis.py clients_q_0
 rm -r clients_q_0
 
 # echo "clients_priority_req"
-# python run.py clients_priority_req
+# python run.py clients_priority_req --resume
 # python kpis.py clients_priority_req
-# rm -r clients_priority_req
\ No newline at end of file
+# rm -r clients_priority_req
+
+# echo "paired comparison against clients, common random numbers"
+# python run.py clients --compare clients_plus_cs clients_plus_seller clients_q_1 --n 10000
+
+# echo "sweep: sellers x client supports x monitor length, one store"
+# python -m src.runner.sweep --store sweep.db --sellers 1 2 3 --client-supports 1 2 3 --queue-len 0 1 2 --replications 1000
+
+# echo "long run: a year of days, clients carried over the night, batch means"
+# python -m src.runner.horizon --days 365 --warmup-days 10 --carry-over --batches 20 --out notebooks/long_run.csv
@@ -1,43 +1,62 @@
 try:
     from simulation import run, save
     from entities.totem import Totem
+    from random_vars import client as ClientRandomVar
     from entities.workers import Seller, SellerAndClientSupport, ClientSupport
+    from entities.records import ClientRecords
+    from metrics.collector import KPICollector
+    from results.sinks import SINKS
+    from results.writer import BatchWriter
+    from runner.adaptive import AdaptiveRunner
+    from runner.scheduler import ReplicationScheduler
+    from runner.paired import PairedComparison
+    from runner.manifest import ProgressManifest
 except ModuleNotFoundError:
     from src.simulation import Simulation
     from src.entities.totem import Totem
+    from src.random_vars import client as ClientRandomVar
+    from src.entities.records import ClientRecords
+    from src.metrics.collector import KPICollector
+    from src.results.sinks import SINKS
+    from src.results.writer import BatchWriter
+    from src.runner.adaptive import AdaptiveRunner
+    from src.runner.scheduler import ReplicationScheduler
+    from src.runner.paired import PairedComparison
+    from src.runner.manifest import ProgressManifest
     from src.entities.workers import Seller, SellerAndClientSupport, ClientSupport
 
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from tqdm import tqdm
 
-import pandas as pd
-import numpy as np
+import argparse
 import os
-import sys
-from functools import partial
 
 seed = 123456
-np.random.seed(seed=seed)
 
 
 def run(
     index,
-    workers
+    workers,
+    waiting_room_size=20,
+    kpis=False,
+    seed=seed
 ):
+    # Replication `index` only depends on (seed, index)
+    ClientRandomVar.seed(seed, index)
+
     s = Simulation(
-        waiting_room_size=20,
+        waiting_room_size=waiting_room_size,
         totem=Totem(),
-        workers=workers
+        workers=workers,
+        records=None if kpis else ClientRecords(simulation=index),
+        kpis=KPICollector(len(workers)) if kpis else None,
+        keep_clients=False
     ).start().run()
 
-    return [
-        c.to_dict(simulation=index) for c in s.clients
-    ]
-
+    # With kpis the replication only returns its KPIs, no client rows
+    if kpis:
+        return s.kpis.kpis()
 
-def save(index, clients, path=''):
-    df = pd.DataFrame(clients)
-    df.to_csv(path + f's_{index}.csv')
+    return s.records.array
 
 
 options = {
@@ -88,21 +107,151 @@ options = {
 }
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("client_type", choices=options)
+    parser.add_argument("--n", type=int, default=372000)
+    parser.add_argument("--sink", choices=SINKS, default='csv')
+    parser.add_argument("--path", default=None)
+    parser.add_argument("--kpis", action='store_true',
+                        help="compute the KPIs in the simulation and write "
+                             "./notebooks/{client_type}.csv, without client rows")
+    parser.add_argument("--adaptive", action='store_true',
+                        help="with --kpis, stop once the KPIs confidence "
+                             "intervals are narrow enough, --n at most")
+    parser.add_argument("--precision", type=float, default=0.05)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="replications run by a pool process per task")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="pool size, the CPUs available by default")
+    parser.add_argument("--window", type=int, default=None,
+                        help="tasks submitted and not yet consumed, twice the "
+                             "processes by default")
+    parser.add_argument("--batch-rows", type=int, default=200000,
+                        help="client rows per write to the sink")
+    parser.add_argument("--seed", type=int, default=seed)
+    parser.add_argument("--trace", default=None,
+                        help="directory for the event traces of the pool "
+                             "processes, replay them with python -m src.metrics.trace")
+    parser.add_argument("--resume", action='store_true',
+                        help="skip the replications recorded as done in the "
+                             "manifest of an interrupted run")
+    parser.add_argument("--audit-every", type=int, default=None,
+                        help="check the simulation invariants after every "
+                             "event, with a full audit every AUDIT_EVERY events")
+    parser.add_argument("--profile", nargs='?', const='', default=None,
+                        help="instrument the simulations and write the profile "
+                             "as JSON, ./notebooks/{client_type}_profile.json "
+                             "by default")
+    parser.add_argument("--compare", nargs='+', choices=options, default=None,
+                        help="paired KPI deltas of these scenarios against "
+                             "client_type, on common random numbers, written "
+                             "to ./notebooks/{client_type}_paired.csv")
+
+    args = parser.parse_args()
+
+    # CSV files go to ./{client_type}/, the columnar stores to ./store/
+    path = args.path or ('.' if args.sink == 'csv' else 'store')
+
+    n = args.n
+
+    if args.compare:
+        names = [args.client_type] + [
+            name for name in args.compare if name != args.client_type
+        ]
+        comparison = PairedComparison(
+            {name: options[name] for name in names},
+            seed=args.seed,
+            chunk_size=args.chunk_size,
+            processes=args.processes
+        )
+
+        with comparison, tqdm(total=n) as progress:
+            for done in comparison.run(n):
+                progress.update(done - progress.n)
+
+        report = comparison.report()
+        report.to_csv(f'./notebooks/{args.client_type}_paired.csv', index=False)
+        print(report[report['significant']].to_string(index=False))
+
+    else:
+        scheduler = ReplicationScheduler(
+            options[args.client_type],
+            kpis=args.kpis,
+            chunk_size=args.chunk_size,
+            processes=args.processes,
+            seed=args.seed,
+            profile=args.profile is not None,
+            window=args.window,
+            trace=args.trace,
+            audit_every=args.audit_every
+        )
+
+        with scheduler:
+            if args.kpis and args.adaptive:
+                kpis = AdaptiveRunner(
+                    None,
+                    precision=args.precision,
+                    batch=args.batch,
+                    max_replications=n,
+                    scheduler=scheduler
+                ).run()
+                kpis.to_csv(f'./notebooks/{args.client_type}.csv')
+
+            elif args.kpis:
+                # The manifest keeps the KPIs of every completed range
+                manifest = ProgressManifest(
+                    f'./notebooks/{args.client_type}.manifest.jsonl',
+                    args.client_type, args.seed, resume=args.resume
+                )
+
+                # Ranges complete in any order, rows are written by replication
+                kpis = manifest.kpis()
+                with tqdm(total=n, initial=manifest.completed()) as progress:
+                    for start, stop, results in scheduler.run(n, done=manifest.done()):
+                        manifest.add(start, stop, results)
+                        kpis[start] = results
+                        progress.update(stop - start)
+
+                import pandas as pd
+
+                pd.DataFrame([
+                    row for start in sorted(kpis) for row in kpis[start]
+                ]).to_csv(f'./notebooks/{args.client_type}.csv')
+
+            else:
+                # Without --resume the sink removes the records of a
+                # previous run, the manifest its ranges
+                sink = SINKS[args.sink](path, args.client_type, args.seed, resume=args.resume)
 
-    if len(sys.argv) != 2:
-        raise Exception(sys.argv)
+                # A range is marked done once the sink has it on disk. The
+                # manifest is kept with the records, so removing them drops
+                # it too
+                manifest = ProgressManifest(
+                    os.path.join(sink.directory, 'manifest.jsonl'),
+                    args.client_type, args.seed, resume=args.resume
+                )
 
-    pool = ProcessPoolExecutor()
-    thread = ThreadPoolExecutor()
+                def written(ranges):
+                    for start, stop in ranges:
+                        manifest.add(start, stop)
 
-    n = 372000
+                with sink, \
+                        BatchWriter(sink, args.batch_rows, on_written=written) as writer, \
+                        tqdm(total=n, initial=manifest.completed()) as progress:
+                    for start, stop, cs in scheduler.run(n, done=manifest.done()):
+                        writer.put(cs, (start, stop))
+                        progress.update(stop - start)
+                        progress.set_postfix(
+                            in_flight=scheduler.in_flight, queued=writer.depth
+                        )
 
-    client_type = sys.argv[-1]
-    os.makedirs(client_type, exist_ok=True)
-    f = partial(run, workers=options[client_type])
+                print(writer.report())
 
-    for i, cs in tqdm(enumerate(pool.map(f, range(n))), total=n):
-        thread.submit(save, f'{seed}-{i}', cs, f'./{client_type}/')
+        print(scheduler.report())
 
-    pool.shutdown(True)
-    thread.shutdown(True)
+        if scheduler.profiler is not None:
+            print(scheduler.profiler.format())
+            scheduler.profiler.save(
+                args.profile or f'./notebooks/{args.client_type}_profile.json'
+            )
@@ -8,6 +8,19 @@ class ClientType(Enum):
 
 
 class Client:
+    __slots__ = (
+        'type',
+        'arrive_time',
+        'requirement',
+        'waiting_room_arrive_time',
+        'ticker',
+        'attention_start_time',
+        'price',
+        'leave_time',
+        'leakage_time',
+        'worker_helper',
+    )
+
     def __init__(self, type: ClientType, arrive_time: float) -> None:
         self.type = type
         self.arrive_time = arrive_time
@@ -35,12 +48,6 @@ class Client:
             "worker_helper": self.worker_helper
         }
 
-    def __hash__(self) -> int:
-        if self.ticker:
-            return self.ticker
-
-        return f"{self.type}-{self.arrive_time}"
-
     # def __lt__(self, other):
     #     if not other:
     #         return True
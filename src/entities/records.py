@@ -0,0 +1,64 @@
+import numpy as np
+
+
+CLIENT_DTYPE = np.dtype([
+    ("simulation", np.int64),
+    ("type", "U1"),
+    ("arrive_time", np.float64),
+    ("requirement", np.float64),
+    ("waiting_room_arrive_time", np.float64),
+    ("ticker", np.float64),
+    ("attention_start_time", np.float64),
+    ("price", np.float64),
+    ("leave_time", np.float64),
+    ("leakage_time", np.float64),
+    ("worker_helper", np.float64),
+])
+
+FIELDS = CLIENT_DTYPE.names[2:]
+
+
+class ClientRecords:
+    """
+    Preallocated structured array of the clients who left the system, one
+    row per client with the columns of Client.to_dict, missing values as
+    NaN. It doubles its capacity when full, and `array` is the contiguous
+    buffer of the filled rows.
+    """
+
+    def __init__(self, simulation=0, capacity=1024):
+        self.simulation = simulation
+        self.size = 0
+        self._buffer = np.empty(capacity, dtype=CLIENT_DTYPE)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def array(self):
+        return self._buffer[:self.size]
+
+    def append(self, client):
+        if self.size == len(self._buffer):
+            self._buffer = np.resize(self._buffer, 2 * len(self._buffer))
+
+        self._buffer[self.size] = (
+            self.simulation,
+            client.type.name,
+            *(
+                np.nan if (value := getattr(client, field)) is None else value
+                for field in FIELDS
+            )
+        )
+        self.size += 1
+
+    def clear(self, simulation=None):
+        if simulation is not None:
+            self.simulation = simulation
+
+        self.size = 0
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        return pd.DataFrame(self.array)
@@ -13,6 +13,9 @@ class TotemStatus:
 
 class Totem:
     def __init__(self) -> None:
+        self.reset()
+
+    def reset(self):
         self.counter = defaultdict(int)
         self.status = TotemStatus.FREE
 
@@ -0,0 +1,97 @@
+from heapq import heappush, heappop
+from itertools import count
+
+
+class WaitingRoom:
+    """
+    Clients with a ticket waiting to be called, one heap per requirement.
+
+    Clients are called in the order Client.__lt__ encodes: requirement 1
+    first, then 3, then 2, and by arrive time inside a requirement. The best
+    client a worker can help is the best of the heads of the heaps of its
+    requirements. A removed client (leakage) is only marked, and dropped
+    once it reaches the head of its heap.
+    """
+
+    PRIORITY = {1: 0, 3: 1, 2: 2}
+
+    def __init__(self, size=None):
+        self.size = size
+
+        self._heaps = {requirement: [] for requirement in self.PRIORITY}
+        self._entries = {}
+        self._counter = count()
+        self._removed = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def __contains__(self, client):
+        return client in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    @property
+    def full(self):
+        return self.size is not None and len(self._entries) >= self.size
+
+    def add(self, client):
+        entry = [
+            self.PRIORITY[client.requirement],
+            client.arrive_time,
+            next(self._counter),
+            client
+        ]
+
+        heappush(self._heaps[client.requirement], entry)
+        self._entries[client] = entry
+
+    def remove(self, client):
+        self._entries.pop(client)[-1] = None
+        self._removed += 1
+
+        if self._removed > 32 and self._removed > len(self._entries):
+            self._compact()
+
+    def discard(self, client):
+        if client in self._entries:
+            self.remove(client)
+
+    def best(self, requirements=(1, 2, 3)):
+        """Next client to call among the given requirements, or None"""
+        best = None
+
+        for requirement in requirements:
+            heap = self._heaps[requirement]
+
+            while heap and heap[0][-1] is None:
+                heappop(heap)
+                self._removed -= 1
+
+            if heap and (best is None or heap[0] < best):
+                best = heap[0]
+
+        return best and best[-1]
+
+    def pop(self, requirements=(1, 2, 3)):
+        """Remove and return the next client to call, or None"""
+        client = self.best(requirements)
+
+        if client is not None:
+            heappop(self._heaps[client.requirement])
+            del self._entries[client]
+
+        return client
+
+    def _compact(self):
+        for requirement, heap in self._heaps.items():
+            self._heaps[requirement] = [
+                entry for entry in heap if entry[-1] is not None
+            ]
+            self._heaps[requirement].sort()
+
+        self._removed = 0
@@ -5,16 +5,37 @@ class WorkerStatus:
 
 
 class Worker:
+    # Client requirements the worker can attend
+    requirements = (1, 2, 3)
 
     def __init__(self, launch_time_start, queue_len=2):
-        self.status = WorkerStatus.STOPPER
         self.launch_time_start = launch_time_start
+        self.queue_len = queue_len
+        self.reset()
+
+    def reset(self):
+        self.status = WorkerStatus.STOPPER
         self.have_launch = False
 
-        self.queue = [None] * (queue_len + 1)
+        # Monitor ring buffer: `occupied` clients from `_head`, the first one
+        # being attended, the next ones called and waiting
+        self._slots = [None] * (self.queue_len + 1)
+        self._head = 0
+        self.occupied = 0
+
+    @property
+    def queue(self):
+        """The monitor from its head, padded with None"""
+        size = len(self._slots)
+        return [self._slots[(self._head + i) % size] for i in range(size)]
+
+    def clients(self):
+        """The clients on the monitor, from its head"""
+        size = len(self._slots)
+        return [self._slots[(self._head + i) % size] for i in range(self.occupied)]
 
     def monitor_full(self):
-        return all(x is not None for x in self.queue)
+        return self.occupied == len(self._slots)
 
     @property
     def is_free(self):
@@ -26,27 +47,26 @@ class Worker:
     def next(self):
         assert self.status == WorkerStatus.STOPPER
 
-        self.queue[0] = None
+        if self.occupied:
+            self._slots[self._head] = None
+            self.occupied -= 1
 
-        if all(x is None for x in self.queue):
+        if not self.occupied:
             return None
 
-        while self.queue[0] is None:
-            self.queue.pop(0)
-            self.queue.append(None)
-
-        return self.queue[0]
+        self._head = (self._head + 1) % len(self._slots)
+        return self._slots[self._head]
 
     def call(self, client):
-        for index in range(len(self.queue)):
-            if self.queue[index] is None:
-                self.queue[index] = client
-                break
+        assert self.occupied < len(self._slots)
+
+        self._slots[(self._head + self.occupied) % len(self._slots)] = client
+        self.occupied += 1
 
-        return index == 0 and self.is_free
+        return self.occupied == 1 and self.is_free
 
     def can_help(self, client):
-        return True
+        return client.requirement in self.requirements
 
     def go_to_launch(self, time):
         assert self.status == WorkerStatus.STOPPER
@@ -70,10 +90,8 @@ class SellerAndClientSupport(Worker):
 
 
 class Seller(Worker):
-    def can_help(self, client):
-        return client.requirement == 1
+    requirements = (1,)
 
 
 class ClientSupport(Worker):
-    def can_help(self, client):
-        return client.requirement in [2, 3]
+    requirements = (2, 3)
@@ -1,9 +1,23 @@
+class EventKind:
+    # Integer tag of each event class, the index of its handler in the
+    # Simulation handler table
+    CLIENT_ARRIVE = 0
+    CLIENT_LEAVE_TOTEM = 1
+    CLIENT_LEAVE = 2
+    FEE_SPACE_IN_WAITING_ROOM = 3
+    CLIENT_LEAKAGE = 4
+    WORKER_RETURN_TO_WORK = 5
+
+    COUNT = 6
+
+
 class Event:
-    def __init__(self, time: float, **kwargs):
-        self.time = time
+    __slots__ = ('time',)
+
+    kind: int = None
 
-        for key, value in kwargs.items():
-            setattr(self, key, value)
+    def __init__(self, time: float):
+        self.time = time
 
     def __lt__(self, other):
         return self.time < other.time
@@ -0,0 +1,311 @@
+from bisect import insort
+from heapq import heappush, heappop
+from itertools import count
+from math import inf
+
+
+class EventCalendar:
+    """
+    Future event list of a Simulation.
+
+    Events are ordered by time and, on ties, by insertion order, so two
+    events scheduled for the same instant are run in the order they were
+    dispatched. Entries are stored as (time, sequence, event) tuples, the
+    sequence number being unique, so events are never compared directly.
+    """
+
+    def __init__(self):
+        self._counter = count()
+        self._size = 0
+
+    def push(self, event):
+        self._insert((event.time, next(self._counter), event))
+        self._size += 1
+
+    def pop(self):
+        if not self._size:
+            raise IndexError("pop from an empty event calendar")
+
+        self._size -= 1
+        return self._remove()[2]
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        while self._size:
+            self.pop()
+
+    def __iter__(self):
+        # Debug helper (verbose output, test rules), events in run order
+        for _, _, event in sorted(self._entries()):
+            yield event
+
+    def _insert(self, entry):
+        raise NotImplementedError
+
+    def _remove(self):
+        raise NotImplementedError
+
+    def _entries(self):
+        raise NotImplementedError
+
+
+class HeapCalendar(EventCalendar):
+    """Binary heap, O(log n) push and pop."""
+
+    def __init__(self):
+        super().__init__()
+        self._heap = []
+
+    def push(self, event):
+        heappush(self._heap, (event.time, next(self._counter), event))
+        self._size += 1
+
+    def pop(self):
+        if not self._size:
+            raise IndexError("pop from an empty event calendar")
+
+        self._size -= 1
+        return heappop(self._heap)[2]
+
+    def _entries(self):
+        return self._heap
+
+
+class CalendarQueue(EventCalendar):
+    """
+    Calendar queue (R. Brown, 1988).
+
+    The time axis is split in `buckets` days of `width` hours that wrap
+    around as a year, each day keeps its events sorted. The calendar is
+    resized, and the day width re-estimated from the head of the queue,
+    every time the number of events doubles or halves.
+    """
+
+    MIN_BUCKETS = 2
+
+    def __init__(self, buckets=MIN_BUCKETS, width=1.0):
+        super().__init__()
+        self._setup(max(buckets, self.MIN_BUCKETS), width, 0.0)
+
+    def _setup(self, buckets, width, start):
+        self._buckets = [[] for _ in range(buckets)]
+        self._width = width
+        self._move_to(start)
+
+    def _move_to(self, time):
+        self._day = int(time / self._width)
+        self._current = self._day % len(self._buckets)
+
+    def _insert(self, entry):
+        buckets = self._buckets
+        day = int(entry[0] / self._width)
+
+        insort(buckets[day % len(buckets)], entry)
+
+        # Events scheduled before the current day move the cursor back
+        if day < self._day:
+            self._move_to(entry[0])
+
+        if self._size + 1 > 2 * len(buckets):
+            self._resize(2 * len(buckets))
+
+    def _remove(self):
+        buckets = self._buckets
+        width = self._width
+        index, day = self._current, self._day
+
+        for _ in range(len(buckets)):
+            bucket = buckets[index]
+            if bucket and int(bucket[0][0] / width) <= day:
+                self._current, self._day = index, day
+                entry = bucket.pop(0)
+                break
+
+            index += 1
+            day += 1
+            if index == len(buckets):
+                index = 0
+        else:
+            # Nothing in the coming year, jump to the earliest event
+            entry = min(bucket[0] for bucket in buckets if bucket)
+            self._move_to(entry[0])
+            buckets[self._current].remove(entry)
+
+        if self._size < len(buckets) // 2 and len(buckets) > self.MIN_BUCKETS:
+            self._resize(len(buckets) // 2, entry[0])
+
+        return entry
+
+    def _resize(self, buckets, start=None):
+        entries = sorted(self._entries())
+        if start is None:
+            start = entries[0][0] if entries else 0.0
+
+        self._setup(buckets, self._estimate_width(entries), start)
+        for entry in entries:
+            insort(self._buckets[int(entry[0] / self._width) % buckets], entry)
+
+    def _estimate_width(self, entries):
+        sample = [entry[0] for entry in entries[:25]]
+        gaps = [b - a for a, b in zip(sample, sample[1:])]
+        if not gaps:
+            return self._width
+
+        mean = sum(gaps) / len(gaps)
+        gaps = [gap for gap in gaps if gap <= 2 * mean]
+        mean = sum(gaps) / len(gaps) if gaps else mean
+
+        return 3 * mean if mean > 0 else self._width
+
+    def _entries(self):
+        return [entry for bucket in self._buckets for entry in bucket]
+
+
+class _Rung:
+    __slots__ = ('start', 'width', 'buckets', 'current')
+
+    def __init__(self, start, width, entries):
+        self.start = start
+        self.width = width
+        self.buckets = [[] for _ in range(len(entries))]
+        self.current = 0
+
+        for entry in entries:
+            self.add(entry)
+
+    def bucket_start(self):
+        return self.start + self.current * self.width
+
+    def add(self, entry):
+        index = int((entry[0] - self.start) / self.width)
+        index = min(max(index, self.current), len(self.buckets) - 1)
+        self.buckets[index].append(entry)
+
+
+class LadderQueue(EventCalendar):
+    """
+    Ladder queue (W. T. Tang, R. S. M. Goh, I. L. Thng, 2005).
+
+    Far future events are appended unsorted to the top. When the near
+    future runs out, the top is spread over a rung of buckets, and any
+    bucket holding more than `threshold` events is spread again over a
+    finer rung. Only the bucket about to be consumed is ever sorted, into
+    the bottom list, so push and pop are O(1) amortized.
+    """
+
+    def __init__(self, threshold=50, max_rungs=8):
+        super().__init__()
+        self.threshold = threshold
+        self.max_rungs = max_rungs
+
+        self._top = []
+        self._top_min = inf
+        self._top_max = -inf
+        self._top_start = -inf
+
+        self._rungs: list[_Rung] = []
+        self._bottom = []
+
+    def _insert(self, entry):
+        time = entry[0]
+
+        if time >= self._top_start:
+            self._top.append(entry)
+            self._top_min = min(self._top_min, time)
+            self._top_max = max(self._top_max, time)
+            return
+
+        for rung in self._rungs:
+            if rung.current < len(rung.buckets) and time >= rung.bucket_start():
+                rung.add(entry)
+                return
+
+        insort(self._bottom, entry)
+
+        if len(self._bottom) > self.threshold and \
+                len(self._rungs) < self.max_rungs and \
+                self._bottom[0][0] < self._bottom[-1][0]:
+            self._spawn(self._bottom)
+            self._bottom = []
+
+    def _remove(self):
+        if not self._bottom:
+            self._fill_bottom()
+
+        entry = self._bottom.pop(0)
+
+        if self._size == 0:
+            self._top_start = -inf
+
+        return entry
+
+    def _fill_bottom(self):
+        while True:
+            if not self._rungs:
+                top = self._top
+                self._top = []
+                self._top_start = self._top_max
+
+                if self._top_min == self._top_max:
+                    self._bottom = sorted(top)
+                    self._top_min, self._top_max = inf, -inf
+                    return
+
+                self._spawn(top)
+                self._top_min, self._top_max = inf, -inf
+
+            rung = self._rungs[-1]
+            while rung.current < len(rung.buckets) and \
+                    not rung.buckets[rung.current]:
+                rung.current += 1
+
+            if rung.current == len(rung.buckets):
+                self._rungs.pop()
+                continue
+
+            bucket = rung.buckets[rung.current]
+            rung.buckets[rung.current] = []
+            rung.current += 1
+
+            if len(bucket) > self.threshold and \
+                    len(self._rungs) < self.max_rungs:
+                self._spawn(bucket, rung.start + (rung.current - 1) * rung.width, rung.width)
+                continue
+
+            bucket.sort()
+            self._bottom = bucket
+            return
+
+    def _spawn(self, entries, start=None, span=None):
+        if start is None:
+            start = min(entry[0] for entry in entries)
+            span = max(entry[0] for entry in entries) - start
+
+        self._rungs.append(_Rung(start, span / len(entries) or 1e-12, entries))
+
+    def _entries(self):
+        entries = list(self._top) + list(self._bottom)
+        for rung in self._rungs:
+            for bucket in rung.buckets:
+                entries.extend(bucket)
+
+        return entries
+
+
+CALENDARS = {
+    'heap': HeapCalendar,
+    'calendar': CalendarQueue,
+    'ladder': LadderQueue,
+}
+
+
+def make_calendar(calendar='heap'):
+    if isinstance(calendar, EventCalendar):
+        return calendar
+
+    try:
+        return CALENDARS[calendar]()
+    except KeyError:
+        raise Exception(f"Event calendar '{calendar}' Not Found")
@@ -1,18 +1,21 @@
 try:
-    from events.base import Event
+    from events.base import Event, EventKind
     from entities.client import Client, ClientType
     from random_vars import client as ClientRandomVar
 except ModuleNotFoundError:
-    from src.events.base import Event
+    from src.events.base import Event, EventKind
     from src.entities.client import Client, ClientType
     from src.random_vars import client as ClientRandomVar
 
 
 class ClientArriveEvent(Event):
+    __slots__ = ('client',)
+
+    kind = EventKind.CLIENT_ARRIVE
     ClientClass = Client
 
-    def __init__(self, time: float, client: Client, **kwargs):
-        super().__init__(time, **kwargs)
+    def __init__(self, time: float, client: Client):
+        self.time = time
         self.client = client
 
     @staticmethod
@@ -24,7 +27,7 @@ class ClientArriveEvent(Event):
         return 12 <= time < 14
 
     @staticmethod
-    def generate(time: float, client_type: ClientType, **kwargs):
+    def generate(time: float, client_type: ClientType):
 
         if ClientArriveEvent._is_morning(time):
             delay = ClientRandomVar.next_morning_arrive(client_type)
@@ -37,6 +40,5 @@ class ClientArriveEvent(Event):
 
         return ClientArriveEvent(
             time=time + delay,
-            client=ClientArriveEvent.ClientClass(client_type, time + delay),
-            **kwargs
+            client=ClientArriveEvent.ClientClass(client_type, time + delay)
         )
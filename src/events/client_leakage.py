@@ -0,0 +1,34 @@
+try:
+    from events.base import Event, EventKind
+    from entities.client import Client
+    from random_vars import client as ClientRandomVar
+except ModuleNotFoundError:
+    from src.events.base import Event, EventKind
+    from src.entities.client import Client
+    from src.random_vars import client as ClientRandomVar
+
+
+class ClientLeakageEvent(Event):
+    """
+    The client runs out of patience, in the totem waiting list or in the
+    waiting room. Only used by the scheduled leakage model, the event is
+    a no-op if the client has already left that queue.
+    """
+
+    __slots__ = ('client', 'waiting_room')
+
+    kind = EventKind.CLIENT_LEAKAGE
+
+    def __init__(self, time: float, client: Client, waiting_room: bool):
+        self.time = time
+        self.client = client
+        self.waiting_room = waiting_room
+
+    @staticmethod
+    def generate(time: float, client: Client, waiting_room=False):
+        if waiting_room:
+            delay = ClientRandomVar.waiting_room_patience(client.type)
+        else:
+            delay = ClientRandomVar.totem_waiting_list_patience(client.type)
+
+        return ClientLeakageEvent(time + delay, client, waiting_room)
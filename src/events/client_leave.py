@@ -1,24 +1,27 @@
 try:
-    from events.base import Event
+    from events.base import Event, EventKind
     from entities.client import Client, ClientType
     from entities.workers import Worker
     from random_vars import client as ClientRandomVar
 except ModuleNotFoundError:
-    from src.events.base import Event
+    from src.events.base import Event, EventKind
     from src.entities.client import Client, ClientType
     from src.entities.workers import Worker
     from src.random_vars import client as ClientRandomVar
 
 
 class ClientLeave(Event):
+    __slots__ = ('client', 'worker')
 
-    def __init__(self, time: float, client: Client, worker: Worker, **kwargs):
-        super().__init__(time, **kwargs)
+    kind = EventKind.CLIENT_LEAVE
+
+    def __init__(self, time: float, client: Client, worker: Worker):
+        self.time = time
         self.client = client
         self.worker = worker
 
     @staticmethod
-    def generate(time: float, client: Client, worker: Worker, **kwargs):
+    def generate(time: float, client: Client, worker: Worker):
         worker.make_attention()
 
         delay = ClientRandomVar.get_attention(client.type, client.requirement)
@@ -28,4 +31,4 @@ class ClientLeave(Event):
         )
         client.attention_start_time = time
 
-        return ClientLeave(time + delay, client, worker, **kwargs)
+        return ClientLeave(time + delay, client, worker)
@@ -1,21 +1,24 @@
 try:
-    from events.base import Event
+    from events.base import Event, EventKind
     from entities.client import Client, ClientType
     from random_vars import client as ClientRandomVar
 except ModuleNotFoundError:
-    from src.events.base import Event
+    from src.events.base import Event, EventKind
     from src.entities.client import Client, ClientType
     from src.random_vars import client as ClientRandomVar
 
 
 class ClientLeaveTotemEvent(Event):
+    __slots__ = ('client',)
 
-    def __init__(self, time: float, client: Client, **kwargs):
-        super().__init__(time, **kwargs)
+    kind = EventKind.CLIENT_LEAVE_TOTEM
+
+    def __init__(self, time: float, client: Client):
+        self.time = time
         self.client = client
 
     @staticmethod
-    def generate(time: float, client: Client, **kwargs):
+    def generate(time: float, client: Client):
         delay = ClientRandomVar.next_totem_finish(client.type)
         client.requirement = ClientRandomVar.select_requirement(client.type)
-        return ClientLeaveTotemEvent(time + delay, client, **kwargs)
+        return ClientLeaveTotemEvent(time + delay, client)
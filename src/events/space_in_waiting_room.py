@@ -1,10 +1,14 @@
 try:
-    from events.base import Event
+    from events.base import Event, EventKind
 except ModuleNotFoundError:
-    from src.events.base import Event
+    from src.events.base import Event, EventKind
 
 
 class FeeSpaceInWaitingRoomEvent(Event):
+    __slots__ = ()
+
+    kind = EventKind.FEE_SPACE_IN_WAITING_ROOM
+
     @staticmethod
-    def generate(time: float, **kwargs):
+    def generate(time: float):
         return FeeSpaceInWaitingRoomEvent(time)
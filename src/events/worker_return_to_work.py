@@ -1,14 +1,18 @@
 try:
-    from events.base import Event
+    from events.base import Event, EventKind
 except ModuleNotFoundError:
-    from src.events.base import Event
+    from src.events.base import Event, EventKind
 
 
 class WorkerReturnToWork(Event):
-    def __init__(self, time: float, worker, **kwargs):
-        super().__init__(time, **kwargs)
+    __slots__ = ('worker',)
+
+    kind = EventKind.WORKER_RETURN_TO_WORK
+
+    def __init__(self, time: float, worker):
+        self.time = time
         self.worker = worker
 
     @staticmethod
-    def generate(time: float, worker_index: int, **kwargs):
+    def generate(time: float, worker_index: int):
         return WorkerReturnToWork(time + 1, worker_index)
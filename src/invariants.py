@@ -0,0 +1,122 @@
+try:
+    from events.base import EventKind
+except ModuleNotFoundError:
+    from src.events.base import EventKind
+
+
+class CountedCalendar:
+    """EventCalendar wrapper that counts the pending events of each kind"""
+
+    def __init__(self, calendar):
+        self.calendar = calendar
+        self.kinds = [0] * EventKind.COUNT
+
+    def push(self, event):
+        self.calendar.push(event)
+        self.kinds[event.kind] += 1
+
+    def pop(self):
+        event = self.calendar.pop()
+        self.kinds[event.kind] -= 1
+        return event
+
+    def clear(self):
+        self.calendar.clear()
+        self.kinds = [0] * EventKind.COUNT
+
+    def __len__(self):
+        return len(self.calendar)
+
+    def __iter__(self):
+        return iter(self.calendar)
+
+
+class InvariantChecker:
+    """
+    Incremental Simulation.test_rules, cheap enough to run on every event.
+
+    The number of pending events of each kind is counted as they are pushed
+    and popped, and the monitors are only checked for the workers touched
+    by the last event, against a running map of the client on each monitor
+    slot. New clients are checked when they enter a queue. Every
+    `audit_every` events the whole state is audited with test_rules and
+    the counters are recounted from scratch.
+    """
+
+    def __init__(self, simulation, audit_every=1000):
+        self.simulation = simulation
+        self.audit_every = audit_every
+
+        simulation.events = CountedCalendar(simulation.events)
+        self.reset()
+
+    def reset(self):
+        self.checks = 0
+        self.touched = set()
+
+        # client -> index of the worker whose monitor shows it
+        self.monitor_owner = {}
+        self.monitors = [() for _ in self.simulation.workers]
+        self.occupied = 0
+
+    def check(self, event):
+        s = self.simulation
+        kinds = s.events.kinds
+
+        assert len(s.waiting_room) <= s.waiting_room_size
+
+        client = getattr(event, 'client', None)
+        if event.kind == EventKind.CLIENT_ARRIVE:
+            assert client.arrive_time is not None
+            assert client.type is not None
+
+        elif event.kind == EventKind.CLIENT_LEAVE_TOTEM:
+            assert client.waiting_room_arrive_time is not None
+            assert client.ticker is not None
+            assert client.requirement is not None
+
+        worker = getattr(event, 'worker', None)
+        if worker is not None:
+            self.touched.add(s.worker_index[worker])
+
+        for index in self.touched:
+            self._check_monitor(index)
+        self.touched.clear()
+
+        assert kinds[EventKind.CLIENT_LEAVE_TOTEM] <= 1
+
+        returning = kinds[EventKind.WORKER_RETURN_TO_WORK]
+        assert returning <= len(s.workers)
+        assert kinds[EventKind.CLIENT_LEAVE] <= len(s.workers) - returning
+
+        self.checks += 1
+        if self.audit_every and self.checks % self.audit_every == 0:
+            self.audit()
+
+    def _check_monitor(self, index):
+        clients = tuple(self.simulation.workers[index].clients())
+        assert None not in clients
+
+        for client in self.monitors[index]:
+            del self.monitor_owner[client]
+
+        for client in clients:
+            assert client not in self.monitor_owner, (client, index)
+            self.monitor_owner[client] = index
+
+        self.occupied += len(clients) - len(self.monitors[index])
+        self.monitors[index] = clients
+
+    def audit(self):
+        """test_rules, and the running counters against a full recount"""
+        s = self.simulation
+        s.test_rules()
+
+        kinds = [0] * EventKind.COUNT
+        for event in s.events:
+            kinds[event.kind] += 1
+        assert kinds == s.events.kinds, (kinds, s.events.kinds)
+
+        monitors = [tuple(worker.clients()) for worker in s.workers]
+        assert monitors == self.monitors
+        assert self.occupied == sum(len(clients) for clients in monitors)
@@ -0,0 +1,158 @@
+from math import nan, sqrt
+
+
+class RunningStat:
+    """Count, sum, mean and variance of a stream of values (Welford)"""
+
+    __slots__ = ('count', 'total', 'mean', '_m2')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else nan
+
+    @property
+    def std(self):
+        return sqrt(self.variance) if self.count > 1 else nan
+
+    def merge(self, other):
+        """Add the values of `other` as if they were streamed here"""
+        count = self.count + other.count
+        if not count:
+            return self
+
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.total += other.total
+        self.count = count
+        return self
+
+
+def _percent(part, whole):
+    return part / whole * 100 if whole else nan
+
+
+class KPICollector:
+    """
+    KPIs of a replication updated as each client leaves the system, served
+    or leaked, without keeping the clients. `kpis()` is the dictionary that
+    kpis.compute_kpis builds from the client table, with the worker KPIs for
+    each of the `workers` workers of the office.
+    """
+
+    TYPES = ('A', 'B', 'C')
+    WORK_HOURS = 18 - 9 - 1
+
+    def __init__(self, workers=4):
+        self.workers = workers
+
+        self.clients = 0
+        self.money = 0.0
+        self.leakage = 0
+
+        # morning, noon, evening: [leakage, clients]
+        self.periods = {period: [0, 0] for period in ('morning', 'noon', 'evening')}
+
+        self.type_clients = {t: 0 for t in self.TYPES}
+        self.type_leakage = {t: 0 for t in self.TYPES}
+        self.system_time = {t: RunningStat() for t in self.TYPES}
+        self.waiting_time = {t: RunningStat() for t in self.TYPES}
+
+        self.worker_clients = [0] * workers
+        self.attention_time = [RunningStat() for _ in range(workers)]
+
+    def observe(self, client):
+        leakage = client.leave_time is None
+        client_type = client.type.name
+
+        self.clients += 1
+        self.leakage += leakage
+        if client.price is not None:
+            self.money += client.price
+
+        for period in self._periods(client.arrive_time):
+            self.periods[period][0] += leakage
+            self.periods[period][1] += 1
+
+        end = client.leakage_time if leakage else client.leave_time
+        self.type_clients[client_type] += 1
+        self.type_leakage[client_type] += leakage
+        self.system_time[client_type].add(end - client.arrive_time)
+
+        if client.waiting_room_arrive_time is not None:
+            self.waiting_time[client_type].add(end - client.waiting_room_arrive_time)
+
+        if client.worker_helper is not None:
+            self.worker_clients[client.worker_helper] += 1
+
+            if client.attention_start_time is not None:
+                self.attention_time[client.worker_helper].add(
+                    client.leave_time - client.attention_start_time
+                )
+
+    @staticmethod
+    def _periods(arrive_time):
+        if arrive_time < 12:
+            return ('morning',)
+        if arrive_time < 14:
+            return ('noon',)
+        # The evening starts strictly after 14, as in kpis.global_kpis
+        if arrive_time > 14:
+            return ('evening',)
+        return ()
+
+    def kpis(self):
+        kpis = {
+            "total de clientes fugados": _percent(self.leakage, self.clients),
+            "total de clientes fugados en la mañana": _percent(*self.periods['morning']),
+            "total de clientes fugados al medio día": _percent(*self.periods['noon']),
+            "total de clientes fugados en la tarde": _percent(*self.periods['evening']),
+            "total de ingresos": self.money
+        }
+
+        for t in self.TYPES:
+            kpis.update({
+                f"total de clientes de tipo {t} fugados":
+                    _percent(self.type_leakage[t], self.type_clients[t]),
+                f"Tiempo promedio en el sistema clientes tipo {t}":
+                    _percent(self.system_time[t].total, self.system_time[t].count),
+                f"Tiempo promedio en la sala de espera clientes tipo {t}":
+                    _percent(self.waiting_time[t].total, self.waiting_time[t].count),
+            })
+
+        for w in range(self.workers):
+            worker = float(w)
+            kpis.update({
+                f"Porcentaje de tiempo de trabajo el modulo {worker} empleado en la atención de clientes":
+                    self.attention_time[w].total / self.WORK_HOURS * 100,
+                f"Porciento de clientes atendidos por el modulo {worker}":
+                    _percent(self.worker_clients[w], self.clients),
+            })
+
+        return kpis
+
+    def summary(self):
+        """Mean and standard deviation of the times of each client type"""
+        return {
+            t: {
+                "system_time_mean": self.system_time[t].mean,
+                "system_time_std": self.system_time[t].std,
+                "waiting_time_mean": self.waiting_time[t].mean,
+                "waiting_time_std": self.waiting_time[t].std,
+            }
+            for t in self.TYPES
+        }
@@ -0,0 +1,189 @@
+import json
+from collections import defaultdict
+from time import perf_counter
+
+try:
+    from random_vars import client as ClientRandomVar
+except ModuleNotFoundError:
+    from src.random_vars import client as ClientRandomVar
+
+
+class SimulationProfiler:
+    """
+    Optional instrumentation of Simulation.run, given as `profiler`.
+
+    Records per event type the number of events and the time spent in
+    their handlers, the same for the passive actions per entity type and
+    for test_rules, the variates drawn per random variable, and the time
+    weighted histograms of the queue lengths (hours the queue spent at each
+    length). A profiler can be shared by many replications, and the
+    profilers of several processes merged.
+    """
+
+    QUEUES = ('waiting_room', 'totem_waiting_list', 'events')
+
+    def __init__(self):
+        self.replications = 0
+        self.seconds = 0.0
+
+        self.events = defaultdict(int)
+        self.event_time = defaultdict(float)
+        self.passive = defaultdict(int)
+        self.passive_time = defaultdict(float)
+        self.test_rules_calls = 0
+        self.test_rules_time = 0.0
+
+        self.draws = defaultdict(int)
+        self.histograms = {queue: defaultdict(float) for queue in self.QUEUES}
+
+    #####################################################################
+    # Simulation Hooks
+    ####################################################################
+
+    def begin(self, simulation):
+        self._began = perf_counter()
+        self._clock = simulation.clock
+        self._draws = {name: var.draws for name, var in ClientRandomVar.RANDOM_VARS}
+
+    def end(self, simulation):
+        self.seconds += perf_counter() - self._began
+        self.replications += 1
+
+        for name, var in ClientRandomVar.RANDOM_VARS:
+            self.draws[name] += var.draws - self._draws[name]
+
+    def run_event(self, simulation, event):
+        # The queues kept their lengths since the previous event
+        elapsed = event.time - self._clock
+        self._clock = event.time
+        self.histograms['waiting_room'][len(simulation.waiting_room)] += elapsed
+        self.histograms['totem_waiting_list'][len(simulation.totem_waiting_list)] += elapsed
+        self.histograms['events'][len(simulation.events)] += elapsed
+
+        name = type(event).__name__
+        began = perf_counter()
+        simulation.run_event(event)
+        self.event_time[name] += perf_counter() - began
+        self.events[name] += 1
+
+    def passive_event(self, simulation, entity):
+        name = type(entity).__name__
+        began = perf_counter()
+        simulation.passive_event(entity)
+        self.passive_time[name] += perf_counter() - began
+        self.passive[name] += 1
+
+    def test_rules(self, simulation):
+        began = perf_counter()
+        simulation.test_rules()
+        self.test_rules_time += perf_counter() - began
+        self.test_rules_calls += 1
+
+    #####################################################################
+    # Results
+    ####################################################################
+
+    @property
+    def events_per_second(self):
+        return sum(self.events.values()) / self.seconds if self.seconds else 0.0
+
+    def merge(self, other):
+        self.replications += other.replications
+        self.seconds += other.seconds
+        self.test_rules_calls += other.test_rules_calls
+        self.test_rules_time += other.test_rules_time
+
+        for mine, theirs in (
+            (self.events, other.events),
+            (self.event_time, other.event_time),
+            (self.passive, other.passive),
+            (self.passive_time, other.passive_time),
+            (self.draws, other.draws),
+        ):
+            for key, value in theirs.items():
+                mine[key] += value
+
+        for queue, histogram in other.histograms.items():
+            for length, hours in histogram.items():
+                self.histograms[queue][length] += hours
+
+        return self
+
+    def to_dict(self):
+        return {
+            "replications": self.replications,
+            "seconds": self.seconds,
+            "events_per_second": self.events_per_second,
+            "events": dict(self.events),
+            "event_time": dict(self.event_time),
+            "passive": dict(self.passive),
+            "passive_time": dict(self.passive_time),
+            "test_rules_calls": self.test_rules_calls,
+            "test_rules_time": self.test_rules_time,
+            "draws": dict(self.draws),
+            "histograms": {
+                queue: {str(length): hours for length, hours in sorted(histogram.items())}
+                for queue, histogram in self.histograms.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        profiler = cls()
+        profiler.replications = data["replications"]
+        profiler.seconds = data["seconds"]
+        profiler.test_rules_calls = data["test_rules_calls"]
+        profiler.test_rules_time = data["test_rules_time"]
+
+        for name in ('events', 'event_time', 'passive', 'passive_time', 'draws'):
+            getattr(profiler, name).update(data[name])
+
+        for queue, histogram in data["histograms"].items():
+            profiler.histograms[queue].update(
+                {int(length): hours for length, hours in histogram.items()}
+            )
+
+        return profiler
+
+    def save(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            return cls.from_dict(json.load(file))
+
+    def format(self):
+        events = sum(self.events.values())
+        lines = [
+            f"{self.replications} replications, {events} events in "
+            f"{self.seconds:.2f}s, {self.events_per_second:.0f} events/s"
+        ]
+
+        handlers = [
+            (f"event {name}", self.events[name], self.event_time[name])
+            for name in self.events
+        ] + [
+            (f"passive {name}", self.passive[name], self.passive_time[name])
+            for name in self.passive
+        ]
+        if self.test_rules_calls:
+            handlers.append(("test_rules", self.test_rules_calls, self.test_rules_time))
+
+        for name, count, seconds in sorted(handlers, key=lambda h: -h[2]):
+            lines.append(
+                f"  {name}: {count} calls, {seconds:.3f}s "
+                f"({seconds / self.seconds if self.seconds else 0:.1%}), "
+                f"{seconds / count * 1e6 if count else 0:.2f}us/call"
+            )
+
+        lines.append(f"  draws: {sum(self.draws.values())}")
+        for queue, histogram in self.histograms.items():
+            hours = sum(histogram.values())
+            mean = sum(l * h for l, h in histogram.items()) / hours if hours else 0
+            lines.append(
+                f"  {queue}: mean length {mean:.2f}, max {max(histogram, default=0)}"
+            )
+
+        return '\n'.join(lines)
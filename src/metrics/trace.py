@@ -0,0 +1,238 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+try:
+    from events.base import EventKind
+    from entities.client import ClientType
+except ModuleNotFoundError:
+    from src.events.base import EventKind
+    from src.entities.client import ClientType
+
+
+class TraceFormat:
+    # A JSON header line, then the raw records
+    BINARY = 'binary'
+    # A JSON header line, then one JSON object per record
+    NDJSON = 'ndjson'
+
+
+# Event class names by EventKind, for the renderer
+KINDS = {
+    value: name for name, value in vars(EventKind).items()
+    if not name.startswith('_') and name != 'COUNT'
+}
+
+
+FIELDS = [
+    ("simulation", np.int64),
+    ("time", np.float64),
+    ("kind", np.int8),
+    ("type", np.int8),
+    ("ticker", np.int32),
+    ("worker", np.int16),
+    ("waiting_room", np.int32),
+    ("totem_waiting_list", np.int32),
+    ("events", np.int32),
+]
+
+
+def trace_dtype(workers):
+    """
+    One record per event: the event, the ids of its client (ClientType
+    value and ticker, 0 and -1 when none) and of its worker (-1), and the
+    queue lengths once the event and the passive actions it woke up were
+    run, the occupied slots of each monitor last. Lengths are int32, queues
+    and monitors are not bounded by the simulation.
+    """
+    return np.dtype(FIELDS + [("monitors", np.int32, (workers,))])
+
+
+def _flat_dtype(workers):
+    # trace_dtype with a field per monitor, the same memory layout, so the
+    # flat record tuples convert faster
+    return np.dtype(FIELDS + [(f"monitor_{i}", np.int32) for i in range(workers)])
+
+
+class TraceRecorder:
+    """
+    Structured event log of Simulation.run, given as `trace`.
+
+    Records are tuples appended to a list, and written to `path` in bulk
+    every `buffer_size` records and at the end of every run, after a JSON
+    header with the office layout. Without a path they are only kept in
+    memory, `array()`. `simulation` is written with every record, so one
+    recorder can trace many replications.
+    """
+
+    def __init__(self, path=None, format=TraceFormat.BINARY, buffer_size=65536):
+        self.path = path
+        self.format = format
+        self.buffer_size = buffer_size
+        self.simulation = 0
+
+        self.header = None
+        self.dtype = None
+        self._flat = None
+        self.rows = []
+        self.records = 0
+
+    #####################################################################
+    # Simulation Hooks
+    ####################################################################
+
+    def begin(self, simulation):
+        if self.header is not None:
+            return
+
+        self.header = {
+            "format": self.format,
+            "workers": len(simulation.workers),
+            "monitor_sizes": [worker.queue_len + 1 for worker in simulation.workers],
+            "waiting_room_size": simulation.waiting_room_size,
+        }
+        self.dtype = trace_dtype(len(simulation.workers))
+        self._flat = _flat_dtype(len(simulation.workers))
+
+        if self.path is not None:
+            with open(self.path, 'w') as file:
+                file.write(json.dumps(self.header) + '\n')
+
+    def record(self, simulation, event):
+        client = getattr(event, 'client', None)
+        worker = getattr(event, 'worker', None)
+
+        self.rows.append((
+            self.simulation,
+            event.time,
+            event.kind,
+            client.type.value if client is not None else 0,
+            client.ticker if client is not None and client.ticker is not None else -1,
+            simulation.worker_index[worker] if worker is not None else -1,
+            len(simulation.waiting_room),
+            len(simulation.totem_waiting_list),
+            len(simulation.events),
+            *[w.occupied for w in simulation.workers],
+        ))
+
+        if self.path is not None and len(self.rows) >= self.buffer_size:
+            self.flush()
+
+    def end(self, simulation):
+        self.flush()
+
+    #####################################################################
+    # Output
+    ####################################################################
+
+    def array(self):
+        return np.array(self.rows, dtype=self._flat).view(self.dtype)
+
+    def flush(self):
+        if self.path is None or not self.rows:
+            return
+
+        if self.format == TraceFormat.BINARY:
+            with open(self.path, 'ab') as file:
+                file.write(self.array().tobytes())
+        else:
+            names = self.dtype.names[:-1]
+            with open(self.path, 'a') as file:
+                file.writelines(
+                    json.dumps({**dict(zip(names, row)), "monitors": row[len(names):]}) + '\n'
+                    for row in self.rows
+                )
+
+        self.records += len(self.rows)
+        self.rows = []
+
+
+class TracePrinter(TraceRecorder):
+    """Renders every record as it is recorded, `delay` seconds apart"""
+
+    def __init__(self, delay=None):
+        super().__init__()
+        self.delay = delay
+
+    def record(self, simulation, event):
+        super().record(simulation, event)
+        record = self.array()[0]
+        self.rows.clear()
+
+        if self.delay is not None:
+            time.sleep(self.delay)
+            print(CLEAR, end='')
+        print(render(self.header, record))
+
+
+#####################################################################
+# Replay
+####################################################################
+
+# ANSI clear screen and cursor home
+CLEAR = "\033[2J\033[H"
+
+
+def read_trace(path):
+    """The header and the records array of a trace file"""
+    with open(path, 'rb') as file:
+        header = json.loads(file.readline())
+        dtype = trace_dtype(header['workers'])
+
+        if header['format'] == TraceFormat.BINARY:
+            return header, np.frombuffer(file.read(), dtype=dtype)
+
+        return header, np.array([
+            tuple(json.loads(line).values()) for line in file
+        ], dtype=dtype)
+
+
+def render(header, record):
+    """The text view of a record"""
+    # Clients get their ticker at the totem
+    client = f" {ClientType(record['type']).name}" if record['type'] else ''
+    if record['ticker'] >= 0:
+        client += f"-{record['ticker']}"
+    worker = f" worker {record['worker']}" if record['worker'] >= 0 else ''
+
+    lines = [
+        f"Clock: {record['time']} --> {KINDS[record['kind']]}{client}{worker}",
+        f"Waiting Room ({record['waiting_room']}/{header['waiting_room_size']}): "
+        f"{'I' * record['waiting_room']}",
+        f"Totem Waiting Room ({record['totem_waiting_list']}): "
+        f"{'I' * record['totem_waiting_list']}",
+    ]
+    lines.extend(
+        f"Monitor Worker({i}): {'I' * occupied}{'.' * (size - occupied)}"
+        for i, (occupied, size) in enumerate(zip(record['monitors'], header['monitor_sizes']))
+    )
+    lines.append(f"Events Queue: {record['events']}")
+    lines.append('-' * 105)
+
+    return '\n'.join(lines)
+
+
+def replay(path, delay=None, simulation=None):
+    """Prints the text view of every record, as an animation with `delay`"""
+    header, records = read_trace(path)
+    if simulation is not None:
+        records = records[records['simulation'] == simulation]
+
+    for record in records:
+        if delay is not None:
+            time.sleep(delay)
+            print(CLEAR, end='')
+        print(render(header, record))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--delay", type=float, default=None)
+    parser.add_argument("--simulation", type=int, default=None,
+                        help="only the records of this replication")
+
+    args = parser.parse_args()
+    replay(args.path, args.delay, args.simulation)
@@ -1,10 +1,25 @@
-from scipy import stats
+import numpy as np
 
 
 class RandomVar:
-    def __init__(self, *dist_params):
+    """
+    Random variable backed by a buffer of pre-drawn variates.
+
+    Variates are drawn `block_size` at a time from the variable's own numpy
+    Generator, so `generate` is just an index bump on the buffer. Until a
+    Generator is given with `seed`, one is derived from numpy's global state
+    on the first draw, so np.random.seed keeps runs reproducible.
+    """
+
+    BLOCK_SIZE = 1024
+
+    def __init__(self, *dist_params, block_size=None, rng=None):
         self.dist_params = dist_params
         self.factor = 1
+        self.block_size = block_size or RandomVar.BLOCK_SIZE
+        self._consumed = 0
+        self._index = 0
+        self.seed(rng)
 
     def __mul__(self, other):
         self.factor = other
@@ -14,10 +29,47 @@ class RandomVar:
         self.factor = other
         return self
 
+    def seed(self, rng=None):
+        if rng is not None and not isinstance(rng, np.random.Generator):
+            rng = np.random.default_rng(rng)
+
+        self.rng = rng
+        self._consumed += self._index
+        self._buffer = []
+        self._index = 0
+
+    @property
+    def draws(self):
+        """Variates used since the variable was created"""
+        return self._consumed + self._index
+
     def generate(self, *dist_params):
-        return self.factor * self.__generate__(*dist_params)
+        if self._index == len(self._buffer):
+            self._refill()
+
+        value = self._buffer[self._index]
+        self._index += 1
+        return self.factor * value
+
+    def draw(self, size, rng=None):
+        """`size` variates at once, from `rng` if given, as a numpy array"""
+        if rng is None:
+            rng = self._rng()
+
+        return self.factor * self.__draw__(size, rng)
+
+    def _rng(self):
+        if self.rng is None:
+            self.rng = np.random.default_rng(np.random.randint(2**63))
+
+        return self.rng
 
-    def __generate__(self, *dist_params):
+    def _refill(self):
+        self._consumed += self._index
+        self._buffer = self.__draw__(self.block_size, self._rng()).tolist()
+        self._index = 0
+
+    def __draw__(self, size, rng):
         pass
 
 
@@ -29,13 +81,15 @@ class ExponentialRandomVar(RandomVar):
       to using scale = 1 / lambda.
     """
 
-    def __generate__(self):
-        return stats.expon.rvs(*self.dist_params, size=1)[0]
+    def __draw__(self, size, rng):
+        loc, scale = self.dist_params
+        return loc + rng.exponential(scale, size)
 
 
 class Chi2RandomVar(RandomVar):
-    def __generate__(self):
-        return stats.chi2.rvs(*self.dist_params, size=1)[0]
+    def __draw__(self, size, rng):
+        df, loc, scale = self.dist_params + (0, 1)[len(self.dist_params) - 1:]
+        return loc + scale * rng.chisquare(df, size)
 
 
 class UniformRandomVar(RandomVar):
@@ -46,8 +100,9 @@ class UniformRandomVar(RandomVar):
       distribution on [loc, loc + scale].
     """
 
-    def __generate__(self):
-        return stats.uniform.rvs(*self.dist_params, size=1)[0]
+    def __draw__(self, size, rng):
+        loc, scale = self.dist_params
+        return rng.uniform(loc, loc + scale, size)
 
 
 class LogNormRandomVar(RandomVar):
@@ -58,20 +113,18 @@ class LogNormRandomVar(RandomVar):
       s = sigma and scale = exp(mu).
     """
 
-    def __generate__(self):
-        return stats.lognorm.rvs(*self.dist_params, size=1)[0]
+    def __draw__(self, size, rng):
+        s, loc, scale = self.dist_params
+        return loc + scale * rng.lognormal(0, s, size)
 
 
 class MultiModalRandomVar(RandomVar):
-    def __init__(self, weights):
-        super().__init__()
+    def __init__(self, weights, **kwargs):
+        super().__init__(**kwargs)
         self.weights = weights
-        self.selection_dist = stats.rv_discrete(
-            values=(range(len(weights)), weights)
-        )
 
-    def __generate__(self):
-        selected_index = self.selection_dist.rvs()
+    def __draw__(self, size, rng):
+        selected_index = rng.choice(len(self.weights), size, p=self.weights)
 
         return selected_index + 1
 
@@ -80,10 +133,41 @@ class ConstantRandomVar(RandomVar):
     def __init__(self, constant):
         super().__init__(constant)
 
-    def __generate__(self):
-        return self.dist_params[0]
+    def generate(self):
+        return self.factor * self.dist_params[0]
+
+    def __draw__(self, size, rng):
+        return np.full(size, self.dist_params[0])
 
 
 class GeometricRandomVar(RandomVar):
-    def __generate__(self, t):
-        return 1 - stats.geom.cdf(t, self.dist_params[0])
+    """
+    Leakage law of a client, time measured in whole minutes.
+
+    generate(t) is the probability that the client is still waiting after
+    t minutes, 1 - cdf(t) = (1 - p) ** t, read from a table for the first
+    TABLE_SIZE minutes. sample() draws, once, the minute at which the
+    client gives up, so P(sample() > t) == generate(t).
+    """
+
+    TABLE_SIZE = 24 * 60
+
+    def __init__(self, p, **kwargs):
+        super().__init__(p, **kwargs)
+        self.survival = ((1 - p) ** np.arange(self.TABLE_SIZE)).tolist()
+
+    def generate(self, t):
+        if t < 1:
+            return self.factor * 1.0
+
+        t = int(t)
+        if t < self.TABLE_SIZE:
+            return self.factor * self.survival[t]
+
+        return self.factor * (1 - self.dist_params[0]) ** t
+
+    def sample(self):
+        return super().generate()
+
+    def __draw__(self, size, rng):
+        return rng.geometric(self.dist_params[0], size)
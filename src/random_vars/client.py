@@ -1,5 +1,4 @@
 import numpy as np
-import random
 
 try:
     from random_vars.base import ExponentialRandomVar
@@ -8,6 +7,7 @@ try:
     from random_vars.base import UniformRandomVar
     from random_vars.base import LogNormRandomVar
     from random_vars.base import GeometricRandomVar
+    from random_vars.streams import RandomStreams, collect
 
     from entities.client import ClientType, Client
 except ModuleNotFoundError:
@@ -17,6 +17,7 @@ except ModuleNotFoundError:
     from src.random_vars.base import UniformRandomVar
     from src.random_vars.base import LogNormRandomVar
     from src.random_vars.base import GeometricRandomVar
+    from src.random_vars.streams import RandomStreams, collect
 
     from src.entities.client import ClientType, Client
 
@@ -47,6 +48,7 @@ class A:
     # Random Vars Leakage
     TotemWaitingListLeakage = GeometricRandomVar(0.03)
     WaitingRoomLeakage = GeometricRandomVar(0.01)
+    LeakageDraw = UniformRandomVar(0, 1)
     LeakageCost = ConstantRandomVar(-100000)
 
 
@@ -76,6 +78,7 @@ class B:
     # Random Vars Leakage
     TotemWaitingListLeakage = GeometricRandomVar(0.03)
     WaitingRoomLeakage = GeometricRandomVar(0.01)
+    LeakageDraw = UniformRandomVar(0, 1)
     LeakageCost = ConstantRandomVar(-300000)
 
 
@@ -97,6 +100,7 @@ class C:
     # Random Vars Leakage
     TotemWaitingListLeakage = GeometricRandomVar(0.03)
     WaitingRoomLeakage = GeometricRandomVar(0.01)
+    LeakageDraw = UniformRandomVar(0, 1)
     LeakageCost = ConstantRandomVar(-100000)
 
 
@@ -109,11 +113,27 @@ def get_random_var(type: ClientType):
         return C
     raise Exception("ClientRandomVar Not Found")
 
+
+RANDOM_VARS = collect(A, B, C)
+
+
+def seed(seed, replication=0):
+    """Seeds every random var with its own stream of `replication`"""
+    RandomStreams(seed, RANDOM_VARS).seed_replication(replication)
+
 ########################################################################
 # Random Vars of Client Arrive Event
 ########################################################################
 
 
+def set_arrival_multiplier(multiplier=1):
+    """Scales the arrival rates of every client type, 2 doubles the arrivals"""
+    for rvar in (A, B, C):
+        rvar.MorningArrival.factor = 1 / multiplier
+        rvar.NoonArrival.factor = 1 / multiplier
+        rvar.EveningArrival.factor = 1 / multiplier
+
+
 def next_morning_arrive(type: ClientType):
     rvar = get_random_var(type)
     return rvar.MorningArrival.generate()
@@ -179,7 +199,7 @@ def leakage_from_totem_waiting_list(client: Client, clock):
     t = round((clock - client.arrive_time) * 60)
 
     prob = rvar.TotemWaitingListLeakage.generate(t)
-    rnum = random.random()
+    rnum = rvar.LeakageDraw.generate()
 
     return rnum > prob
 
@@ -189,11 +209,21 @@ def leakage_from_waiting_room(client: Client, clock):
     t = round((clock - client.waiting_room_arrive_time) * 60)
 
     prob = rvar.WaitingRoomLeakage.generate(t)
-    rnum = random.random()
+    rnum = rvar.LeakageDraw.generate()
 
     return rnum > prob
 
 
+def totem_waiting_list_patience(type: ClientType):
+    rvar = get_random_var(type)
+    return rvar.TotemWaitingListLeakage.sample() / 60
+
+
+def waiting_room_patience(type: ClientType):
+    rvar = get_random_var(type)
+    return rvar.WaitingRoomLeakage.sample() / 60
+
+
 def leakage_cost(client: Client):
     rvar = get_random_var(client.type)
     return rvar.LeakageCost.generate()
@@ -0,0 +1,60 @@
+import numpy as np
+
+try:
+    from random_vars.base import RandomVar
+except ModuleNotFoundError:
+    from src.random_vars.base import RandomVar
+
+
+def collect(*namespaces, prefix=''):
+    """
+    (name, RandomVar) pairs of the given classes, nested classes included,
+    in definition order, e.g. ('A.RequirementType1.Price', ...).
+    """
+    random_vars = []
+
+    for namespace in namespaces:
+        name = prefix + namespace.__name__
+
+        for attr, value in vars(namespace).items():
+            if isinstance(value, RandomVar):
+                random_vars.append((f'{name}.{attr}', value))
+            elif isinstance(value, type):
+                random_vars.extend(collect(value, prefix=f'{name}.'))
+
+    return random_vars
+
+
+class RandomStreams:
+    """
+    Independent random number streams, one per replication and random
+    variable, spawned from a single seed with numpy's SeedSequence.
+
+    Replication i gets the sequence SeedSequence(seed, spawn_key=(i,)),
+    the i-th child of SeedSequence(seed), and its k-th random variable the
+    k-th child of that one. A replication only depends on (seed, i): it can
+    be re-run on its own, in any process, and two scenarios run with the
+    same seed use the same streams (common random numbers).
+    """
+
+    def __init__(self, seed, random_vars):
+        self.seed = seed
+        self.random_vars = random_vars
+
+    def sequence(self, replication):
+        return np.random.SeedSequence(self.seed, spawn_key=(replication,))
+
+    def generators(self, replication):
+        return {
+            name: np.random.default_rng(child)
+            for (name, _), child in zip(
+                self.random_vars,
+                self.sequence(replication).spawn(len(self.random_vars))
+            )
+        }
+
+    def seed_replication(self, replication):
+        generators = self.generators(replication)
+
+        for name, var in self.random_vars:
+            var.seed(generators[name])
@@ -0,0 +1,253 @@
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class ResultsSink:
+    """
+    Destination of the client records (ClientRecords arrays) of a sweep.
+
+    `write` takes the records of one or several whole replications, a
+    replication is never split between two writes. Sinks are built with
+    (path, scenario, seed) and write under their `directory`; without
+    `resume` the records a previous run wrote there for the same scenario
+    and seed are removed first.
+    """
+
+    def write(self, records):
+        raise NotImplementedError
+
+    def flush(self):
+        """Everything written so far is on disk when flush returns"""
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class CSVSink(ResultsSink):
+    """
+    The historical layout, one {path}/{scenario}/s_{seed}-{i}.csv per
+    replication. Files are written by a thread pool, `max_pending` at most
+    at once, write blocks beyond that.
+    """
+
+    def __init__(self, path, scenario, seed, max_pending=64, resume=False):
+        self.directory = os.path.join(path, scenario)
+        self.seed = seed
+        self.pool = ThreadPoolExecutor()
+        self.pending = deque()
+        self.max_pending = max_pending
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        if not resume:
+            for filename in os.listdir(self.directory):
+                if filename.startswith(f's_{seed}-') and filename.endswith('.csv'):
+                    os.remove(os.path.join(self.directory, filename))
+
+    def write(self, records):
+        for simulation in np.unique(records['simulation']):
+            while len(self.pending) >= self.max_pending:
+                self.pending.popleft().result()
+
+            self.pending.append(self.pool.submit(
+                self._save, simulation, records[records['simulation'] == simulation]
+            ))
+
+    def _save(self, simulation, records):
+        import pandas as pd
+
+        df = pd.DataFrame(records)
+        df.to_csv(os.path.join(self.directory, f's_{self.seed}-{simulation}.csv'))
+
+    def flush(self):
+        while self.pending:
+            self.pending.popleft().result()
+
+    def close(self):
+        self.flush()
+        self.pool.shutdown(True)
+
+
+class ColumnarSink(ResultsSink):
+    """
+    Chunked columnar store, partitioned by scenario, seed and replication
+    range:
+
+        {path}/scenario={scenario}/seed={seed}/simulations={first}-{last}/...
+
+    Records are buffered per partition and flushed as one row group every
+    `chunk_rows` rows, on flush and when the sink is closed. With `resume`,
+    part files are numbered after the ones already in the partition, so a
+    resumed sweep adds to the store; otherwise the seed directory is
+    emptied first.
+    """
+
+    EXTENSION = None
+
+    def __init__(
+        self, path, scenario, seed, partition_size=10000, chunk_rows=500000, resume=False
+    ):
+        self.directory = os.path.join(path, f'scenario={scenario}', f'seed={seed}')
+        self.partition_size = partition_size
+        self.chunk_rows = chunk_rows
+        self.resume = resume
+
+        if not resume and os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._pending = {}
+        self._row_groups = {}
+
+    def write(self, records):
+        partitions = records['simulation'] // self.partition_size
+
+        for partition in np.unique(partitions):
+            pending = self._pending.setdefault(partition, [])
+            pending.append(records[partitions == partition])
+
+            if sum(len(chunk) for chunk in pending) >= self.chunk_rows:
+                self._flush(partition)
+
+    def flush(self):
+        for partition in list(self._pending):
+            self._flush(partition)
+
+    def _flush(self, partition):
+        records = np.concatenate(self._pending.pop(partition))
+        first = partition * self.partition_size
+
+        directory = os.path.join(
+            self.directory, f'simulations={first}-{first + self.partition_size - 1}'
+        )
+        os.makedirs(directory, exist_ok=True)
+
+        if partition not in self._row_groups:
+            self._row_groups[partition] = self._next_part(directory) if self.resume else 0
+
+        row_group = self._row_groups[partition]
+        self._row_groups[partition] = row_group + 1
+        self._write_row_group(directory, row_group, records)
+
+    def _next_part(self, directory):
+        parts = [
+            int(filename[len('part-'):-len(self.EXTENSION)])
+            for filename in os.listdir(directory)
+            if filename.startswith('part-') and filename.endswith(self.EXTENSION)
+        ]
+        return max(parts) + 1 if parts else 0
+
+    def _write_row_group(self, directory, row_group, records):
+        raise NotImplementedError
+
+
+class NPZSink(ColumnarSink):
+    """One .npz of columns per row group, NumPy only"""
+
+    EXTENSION = '.npz'
+
+    def _write_row_group(self, directory, row_group, records):
+        # Written aside and renamed, a part file is always complete
+        path = os.path.join(directory, f'part-{row_group:05d}.npz')
+        with open(path + '.tmp', 'wb') as file:
+            np.savez(file, **{name: records[name] for name in records.dtype.names})
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(path + '.tmp', path)
+
+
+class ParquetSink(ColumnarSink):
+    """
+    One Parquet file per partition and flush, appended row group by row
+    group, and renamed to its part-XXXXX.parquet name once closed.
+    """
+
+    EXTENSION = '.parquet'
+
+    def __init__(self, *args, **kwargs):
+        try:
+            import pyarrow  # noqa: F401
+        except ModuleNotFoundError:
+            raise ModuleNotFoundError("ParquetSink needs pyarrow (pip install pyarrow)")
+
+        super().__init__(*args, **kwargs)
+        self._writers = {}
+
+    def _write_row_group(self, directory, row_group, records):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.table({name: records[name] for name in records.dtype.names})
+
+        if directory not in self._writers:
+            path = os.path.join(directory, f'part-{row_group:05d}.parquet')
+            self._writers[directory] = (
+                pq.ParquetWriter(path + '.tmp', table.schema), path
+            )
+
+        self._writers[directory][0].write_table(table)
+
+    def flush(self):
+        super().flush()
+
+        for writer, path in self._writers.values():
+            writer.close()
+            os.replace(path + '.tmp', path)
+
+        self._writers = {}
+
+
+SINKS = {
+    'csv': CSVSink,
+    'npz': NPZSink,
+    'parquet': ParquetSink,
+}
+
+
+def iter_results(path, scenario, seed=None):
+    """
+    DataFrames of the row groups of a columnar store scenario, of one seed
+    or of all of them, whatever the format. A replication is always whole
+    inside one row group.
+    """
+    import pandas as pd
+
+    directory = os.path.join(path, f'scenario={scenario}')
+    seeds = [f'seed={seed}'] if seed is not None else sorted(
+        name for name in os.listdir(directory) if name.startswith('seed=')
+    )
+
+    # Partitions only, the seed directories also keep the run manifest
+    partitions = [
+        os.path.join(directory, seed, partition)
+        for seed in seeds
+        for partition in sorted(os.listdir(os.path.join(directory, seed)))
+        if partition.startswith('simulations=')
+    ]
+
+    for partition in partitions:
+        for filename in sorted(os.listdir(partition)):
+            file_path = os.path.join(partition, filename)
+
+            if filename.endswith(NPZSink.EXTENSION):
+                with np.load(file_path) as data:
+                    yield pd.DataFrame({name: data[name] for name in data.files})
+
+            elif filename.endswith(ParquetSink.EXTENSION):
+                import pyarrow.parquet as pq
+
+                parquet = pq.ParquetFile(file_path)
+                for row_group in range(parquet.num_row_groups):
+                    yield parquet.read_row_group(row_group).to_pandas()
@@ -0,0 +1,108 @@
+from queue import Queue
+from threading import Thread
+from time import perf_counter
+
+import numpy as np
+
+
+class BatchWriter:
+    """
+    Single writer stage in front of a ResultsSink.
+
+    Records arrays are queued, `max_queued` at most: put blocks while the
+    queue is full, so a slow sink slows the producer down instead of
+    buffering without limit. A thread concatenates the queued arrays and
+    writes them to the sink once `batch_rows` rows are pending, and the
+    rest when the writer is closed.
+
+    With `on_written`, the sink is flushed after every write and
+    on_written is called with the (start, stop) ranges given to put for
+    the arrays written, once they are durable.
+    """
+
+    def __init__(self, sink, batch_rows=200000, max_queued=16, on_written=None):
+        self.sink = sink
+        self.batch_rows = batch_rows
+        self.on_written = on_written
+        self.queue = Queue(max_queued)
+        self.error = None
+
+        self.rows = 0
+        self.writes = 0
+        self.write_seconds = 0.0
+        self.max_depth = 0
+        self._began = perf_counter()
+
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def depth(self):
+        return self.queue.qsize()
+
+    def put(self, records, replications=None):
+        if self.error is not None:
+            raise self.error
+
+        self.queue.put((records, replications))
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        pending, rows = [], 0
+
+        while (item := self.queue.get()) is not None:
+            if self.error is not None:
+                continue
+
+            pending.append(item)
+            rows += len(item[0])
+
+            if rows >= self.batch_rows:
+                self._write(pending)
+                pending, rows = [], 0
+
+        if pending and self.error is None:
+            self._write(pending)
+
+    def _write(self, pending):
+        try:
+            began = perf_counter()
+            records = np.concatenate([records for records, _ in pending])
+            self.sink.write(records)
+
+            if self.on_written is not None:
+                self.sink.flush()
+                self.on_written([
+                    replications for _, replications in pending
+                    if replications is not None
+                ])
+
+            self.write_seconds += perf_counter() - began
+            self.rows += len(records)
+            self.writes += 1
+        except Exception as error:
+            # Raised in the producer by the next put, the queue is still
+            # drained so it never blocks
+            self.error = error
+
+    def report(self):
+        elapsed = perf_counter() - self._began
+        return (
+            f"{self.rows} rows in {self.writes} writes, "
+            f"{self.rows / elapsed if elapsed else 0:,.0f} rows/s, "
+            f"{self.write_seconds:.1f}s writing, max queue depth "
+            f"{self.max_depth}/{self.queue.maxsize}"
+        )
@@ -0,0 +1,132 @@
+from math import sqrt, isnan
+
+try:
+    from metrics.collector import RunningStat
+except ModuleNotFoundError:
+    from src.metrics.collector import RunningStat
+
+
+DEFAULT_KPIS = (
+    "total de clientes fugados",
+    "total de ingresos",
+    "Tiempo promedio en la sala de espera clientes tipo A",
+    "Tiempo promedio en la sala de espera clientes tipo B",
+    "Tiempo promedio en la sala de espera clientes tipo C",
+)
+
+
+def half_width(stat, confidence=0.95):
+    """Half width of the t confidence interval of the mean of a RunningStat"""
+    if stat.count < 2:
+        return float('inf')
+
+    from scipy import stats
+
+    t = stats.t.ppf((1 + confidence) / 2, stat.count - 1)
+    return t * stat.std / sqrt(stat.count)
+
+
+class AdaptiveRunner:
+    """
+    Sequential sampling of replications.
+
+    `replicate(index)` runs replication `index` and returns its KPI
+    dictionary, or a ReplicationScheduler with `kpis` runs each batch as
+    chunked ranges. Replications are run `batch` at a time until the confidence
+    interval of every KPI in `kpis` has a half width of at most `precision`
+    times the absolute value of its mean, or `max_replications` were run.
+    """
+
+    def __init__(
+        self,
+        replicate,
+        kpis=DEFAULT_KPIS,
+        precision=0.05,
+        confidence=0.95,
+        batch=1000,
+        min_replications=30,
+        max_replications=372000,
+        executor=None,
+        progress=print,
+        scheduler=None
+    ):
+        self.replicate = replicate
+        self.kpis = kpis
+        self.precision = precision
+        self.confidence = confidence
+        self.batch = batch
+        self.min_replications = min_replications
+        self.max_replications = max_replications
+        self.executor = executor
+        self.progress = progress
+        self.scheduler = scheduler
+
+        self.stats = {kpi: RunningStat() for kpi in kpis}
+        self.results = []
+
+    def replications(self, start, stop):
+        if self.scheduler is not None:
+            for _, _, kpis in self.scheduler.run(stop, start):
+                yield from kpis
+            return
+
+        map_ = self.executor.map if self.executor is not None else map
+        yield from map_(self.replicate, range(start, stop))
+
+    def run(self):
+        while len(self.results) < self.max_replications:
+            start = len(self.results)
+            stop = min(start + self.batch, self.max_replications)
+
+            for kpis in self.replications(start, stop):
+                self.add(kpis)
+
+            report = self.report()
+            if self.progress is not None:
+                self.progress(self.format(report))
+
+            if len(self.results) >= self.min_replications and report['converged'].all():
+                break
+
+        import pandas as pd
+
+        return pd.DataFrame(self.results)
+
+    def add(self, kpis):
+        self.results.append(kpis)
+
+        for kpi, stat in self.stats.items():
+            if not isnan(value := kpis[kpi]):
+                stat.add(value)
+
+    def half_width(self, stat):
+        return half_width(stat, self.confidence)
+
+    def report(self):
+        import pandas as pd
+
+        rows = []
+        for kpi, stat in self.stats.items():
+            half_width = self.half_width(stat)
+            relative = half_width / abs(stat.mean) if stat.mean else \
+                (0.0 if half_width == 0 else float('inf'))
+
+            rows.append({
+                "kpi": kpi,
+                "replications": stat.count,
+                "mean": stat.mean,
+                "half_width": half_width,
+                "relative_half_width": relative,
+                "converged": relative <= self.precision,
+            })
+
+        return pd.DataFrame(rows)
+
+    def format(self, report):
+        lines = [f"{len(self.results)} replications"]
+        lines.extend(
+            f"  {'ok' if row.converged else '..'} {row.kpi}: {row.mean:.6g} "
+            f"± {row.half_width:.4g} ({row.relative_half_width:.2%})"
+            for row in report.itertuples()
+        )
+        return '\n'.join(lines)
@@ -0,0 +1,193 @@
+import argparse
+
+import numpy as np
+from tqdm import tqdm
+
+try:
+    from simulation import Simulation, LeakageModel
+    from random_vars import client as ClientRandomVar
+    from entities.totem import Totem
+    from entities.records import ClientRecords
+    from metrics.collector import KPICollector, RunningStat
+    from results.sinks import SINKS
+    from results.writer import BatchWriter
+    from runner.adaptive import half_width
+    from runner.sweep import PARAMETERS, point, workers
+except ModuleNotFoundError:
+    from src.simulation import Simulation, LeakageModel
+    from src.random_vars import client as ClientRandomVar
+    from src.entities.totem import Totem
+    from src.entities.records import ClientRecords
+    from src.metrics.collector import KPICollector, RunningStat
+    from src.results.sinks import SINKS
+    from src.results.writer import BatchWriter
+    from src.runner.adaptive import half_width
+    from src.runner.sweep import PARAMETERS, point, workers
+
+
+def batch_means(rows, batches=20, confidence=0.95):
+    """
+    Batch means of the KPI rows of consecutive days: the rows are split in
+    `batches` batches of equal size, the last rows left out, and the mean of
+    each KPI is estimated from the means of the batches. `lag1` is the
+    autocorrelation of consecutive batch means, close to 0 when the batches
+    are long enough to be taken as independent.
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame(rows)
+    size = len(frame) // batches
+    if not size:
+        raise ValueError(f"{len(frame)} days can not be split in {batches} batches")
+
+    means = frame.iloc[:size * batches].groupby(np.arange(size * batches) // size).mean()
+
+    report = []
+    for kpi in means.columns:
+        stat = RunningStat()
+        for value in means[kpi].dropna():
+            stat.add(value)
+
+        report.append({
+            "kpi": kpi,
+            "mean": stat.mean if stat.count else np.nan,
+            "half_width": half_width(stat, confidence),
+            "batches": stat.count,
+            "days_per_batch": size,
+            "lag1": means[kpi].autocorr(1) if stat.count > 2 else np.nan,
+        })
+
+    return pd.DataFrame(report)
+
+
+class LongRun:
+    """
+    One simulation of many consecutive office days, for steady state and
+    seasonal analysis, in bounded memory.
+
+    The random streams of (seed, replication) run on from one day to the
+    next. Every night the office is closed: the clients left in the system
+    at the end hour are attended until the queues are empty, or, with
+    `carry_over`, stay in the queues until the next morning. Clients are not
+    kept, they are counted in the KPIs of the day they leave the system and,
+    with a `writer`, their records are put to it at the end of each day, the
+    record `simulation` being the day. The first `warmup_days` days are left
+    out of both.
+    """
+
+    def __init__(
+        self,
+        workers,
+        waiting_room_size=20,
+        seed=123456,
+        replication=0,
+        warmup_days=0,
+        carry_over=False,
+        writer=None,
+        **simulation_kwargs
+    ):
+        self.seed = seed
+        self.replication = replication
+        self.warmup_days = warmup_days
+        self.carry_over = carry_over
+        self.writer = writer
+
+        self.simulation = Simulation(
+            waiting_room_size=waiting_room_size,
+            totem=Totem(),
+            workers=workers,
+            records=ClientRecords() if writer is not None else None,
+            keep_clients=False,
+            **simulation_kwargs
+        )
+
+        # KPI rows of the days after the warm-up
+        self.days = []
+
+    def run(self, days):
+        """Runs `days` days, yields the index of each day once it is over"""
+        s = self.simulation
+        ClientRandomVar.seed(self.seed, self.replication)
+        s.reset()
+
+        for day in range(days):
+            kpis = KPICollector(len(s.workers))
+            s.kpis = kpis
+            if s.records is not None:
+                s.records.clear(simulation=day)
+
+            s.start()
+            if self.carry_over and day < days - 1:
+                s.run(until=s.end_hour)
+                s.carry_over()
+            else:
+                s.run()
+                s.reset()
+
+            if day >= self.warmup_days:
+                self.days.append(kpis.kpis())
+
+                if self.writer is not None and len(s.records):
+                    self.writer.put(s.records.array.copy(), (day, day + 1))
+
+            yield day
+
+    def report(self, batches=20, confidence=0.95):
+        return batch_means(self.days, batches, confidence)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--warmup-days", type=int, default=0)
+    parser.add_argument("--carry-over", action='store_true',
+                        help="clients still waiting at the end hour wait for "
+                             "the next morning instead of being attended")
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=123456)
+    parser.add_argument("--replication", type=int, default=0)
+    parser.add_argument("--leakage", default=LeakageModel.POLLING)
+    parser.add_argument("--scenario", default="long_run")
+    parser.add_argument("--sink", choices=tuple(SINKS), default=None,
+                        help="write the client records, one simulation per day")
+    parser.add_argument("--path", default="store")
+    parser.add_argument("--batch-rows", type=int, default=200000)
+    parser.add_argument("--out", default=None,
+                        help="CSV file for the batch means report")
+
+    # The office, as a design point of runner.sweep
+    for name, (kind, default) in PARAMETERS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=kind, default=default)
+
+    args = parser.parse_args()
+
+    office = point(**{name: getattr(args, name) for name in PARAMETERS})
+    ClientRandomVar.set_arrival_multiplier(office['arrival_multiplier'])
+
+    sink = SINKS[args.sink](args.path, args.scenario, args.seed) if args.sink else None
+    writer = BatchWriter(sink, args.batch_rows) if sink is not None else None
+
+    long_run = LongRun(
+        workers(office),
+        waiting_room_size=office['waiting_room_size'],
+        seed=args.seed,
+        replication=args.replication,
+        warmup_days=args.warmup_days,
+        carry_over=args.carry_over,
+        writer=writer,
+        leakage=args.leakage
+    )
+
+    for _ in tqdm(long_run.run(args.days), total=args.days):
+        pass
+
+    if writer is not None:
+        writer.close()
+        sink.close()
+        print(writer.report())
+
+    report = long_run.report(args.batches, args.confidence)
+    if args.out:
+        report.to_csv(args.out, index=False)
+    print(report.to_string(index=False))
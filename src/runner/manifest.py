@@ -0,0 +1,114 @@
+import json
+import os
+
+
+def merge(ranges):
+    """Sorted, non overlapping union of (start, stop) ranges"""
+    merged = []
+    for start, stop in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+        else:
+            merged.append((start, stop))
+
+    return merged
+
+
+class ProgressManifest:
+    """
+    Durable record of the replication ranges completed for a scenario and
+    seed, so an interrupted sweep can be resumed.
+
+    The manifest is a JSON lines file, one line appended and synced to disk
+    per completed range, after its results are durable. A range can carry
+    its KPI rows, the manifest is then the checkpoint of the results too.
+    A line cut by a crash is ignored. Replications only depend on (seed,
+    replication), so re-running the missing ranges gives the same results
+    as the interrupted run would have.
+    """
+
+    def __init__(self, path, scenario, seed, resume=True):
+        self.path = path
+        self.scenario = scenario
+        self.seed = seed
+
+        self.entries = [
+            entry for entry in self._read()
+            if entry['scenario'] == scenario and entry['seed'] == seed
+        ] if resume else []
+
+        if not resume:
+            self._rewrite_without_own_entries()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return []
+
+        entries = []
+        with open(self.path) as file:
+            for line in file:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+        return entries
+
+    def _rewrite_without_own_entries(self):
+        if not os.path.exists(self.path):
+            return
+
+        others = [
+            entry for entry in self._read()
+            if (entry['scenario'], entry['seed']) != (self.scenario, self.seed)
+        ]
+
+        with open(self.path, 'w') as file:
+            for entry in others:
+                file.write(json.dumps(entry) + '\n')
+
+    def add(self, start, stop, kpis=None):
+        entry = {'scenario': self.scenario, 'seed': self.seed, 'start': start, 'stop': stop}
+        if kpis is not None:
+            entry['kpis'] = kpis
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(self.path, 'a') as file:
+            file.write(json.dumps(entry) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+        self.entries.append(entry)
+
+    def done(self):
+        """Completed ranges, merged"""
+        return merge((entry['start'], entry['stop']) for entry in self.entries)
+
+    def completed(self):
+        return sum(stop - start for start, stop in self.done())
+
+    def kpis(self):
+        """KPI rows of the completed ranges, {start: rows}"""
+        return {
+            entry['start']: entry['kpis'] for entry in self.entries if 'kpis' in entry
+        }
+
+
+def missing(stop, start=0, done=()):
+    """The ranges of start..stop-1 not covered by `done`"""
+    gaps = []
+    for a, b in merge(done):
+        if a > start:
+            gaps.append((start, min(a, stop)))
+        start = max(start, b)
+
+        if start >= stop:
+            break
+
+    if start < stop:
+        gaps.append((start, stop))
+
+    return [(a, b) for a, b in gaps if a < b]
@@ -0,0 +1,119 @@
+from math import isnan
+
+try:
+    from metrics.collector import RunningStat
+    from runner.adaptive import half_width
+    from runner.scheduler import ReplicationScheduler
+except ModuleNotFoundError:
+    from src.metrics.collector import RunningStat
+    from src.runner.adaptive import half_width
+    from src.runner.scheduler import ReplicationScheduler
+
+
+class PairedComparison:
+    """
+    Common random numbers comparison of several worker configurations.
+
+    Replication i of every scenario draws from the same random streams
+    (same seed and replication), so the scenarios see the same arrivals,
+    totem times, requirements and attention times, and the KPI differences
+    against the `baseline` scenario are paired per replication. The
+    variance of a paired difference is usually much lower than the sum of
+    the variances of two independent runs, so a difference is detected
+    with fewer replications.
+    """
+
+    def __init__(
+        self,
+        scenarios,
+        baseline=None,
+        waiting_room_size=20,
+        seed=123456,
+        confidence=0.95,
+        chunk_size=100,
+        processes=None,
+        **simulation_kwargs
+    ):
+        self.scenarios = scenarios
+        self.baseline = baseline or next(iter(scenarios))
+        self.confidence = confidence
+
+        # Every replication of every scenario, on one pool
+        self.scheduler = ReplicationScheduler(
+            scenarios,
+            waiting_room_size=waiting_room_size,
+            kpis=True,
+            chunk_size=chunk_size,
+            processes=processes,
+            seed=seed,
+            **simulation_kwargs
+        )
+
+        # (scenario, kpi) -> RunningStat of the values and of the deltas
+        self.values = {}
+        self.deltas = {}
+        self.replications = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def shutdown(self):
+        self.scheduler.shutdown()
+
+    def run(self, n, start=0):
+        """Runs replications start..n-1, yields the number run so far"""
+        for _, _, results in self.scheduler.run(n, start):
+            for kpis in results:
+                self.add(kpis)
+
+            yield self.replications
+
+    def add(self, kpis):
+        self.replications += 1
+        baseline = kpis[self.baseline]
+
+        for scenario, values in kpis.items():
+            for kpi, value in values.items():
+                if isnan(value):
+                    continue
+
+                self.values.setdefault((scenario, kpi), RunningStat()).add(value)
+
+                reference = baseline.get(kpi, float('nan'))
+                if scenario != self.baseline and not isnan(reference):
+                    self.deltas.setdefault((scenario, kpi), RunningStat()).add(
+                        value - reference
+                    )
+
+    def report(self):
+        """
+        Mean paired delta of every scenario and KPI against the baseline,
+        with its confidence interval, and the ratio of the paired variance
+        to the variance an unpaired comparison would have.
+        """
+        import pandas as pd
+
+        rows = []
+        for (scenario, kpi), delta in self.deltas.items():
+            a, b = self.values[(self.baseline, kpi)], self.values[(scenario, kpi)]
+            h = half_width(delta, self.confidence)
+            unpaired = a.variance + b.variance
+
+            rows.append({
+                "scenario": scenario,
+                "kpi": kpi,
+                "pairs": delta.count,
+                "baseline": a.mean,
+                "mean": b.mean,
+                "delta": delta.mean,
+                "half_width": h,
+                "low": delta.mean - h,
+                "high": delta.mean + h,
+                "significant": not (delta.mean - h <= 0 <= delta.mean + h),
+                "variance_ratio": delta.variance / unpaired if unpaired else float('nan'),
+            })
+
+        return pd.DataFrame(rows)
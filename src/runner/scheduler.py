@@ -0,0 +1,261 @@
+import os
+from time import perf_counter
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+try:
+    from simulation import Simulation
+    from runner.manifest import missing
+    from random_vars import client as ClientRandomVar
+    from entities.totem import Totem
+    from entities.records import ClientRecords
+    from metrics.collector import KPICollector
+    from metrics.profiler import SimulationProfiler
+    from metrics.trace import TraceRecorder
+except ModuleNotFoundError:
+    from src.simulation import Simulation
+    from src.runner.manifest import missing
+    from src.random_vars import client as ClientRandomVar
+    from src.entities.totem import Totem
+    from src.entities.records import ClientRecords
+    from src.metrics.collector import KPICollector
+    from src.metrics.profiler import SimulationProfiler
+    from src.metrics.trace import TraceRecorder
+
+
+def available_cpus():
+    """CPUs this process may run on, which can be fewer than os.cpu_count()"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+#####################################################################
+# Pool Worker State
+####################################################################
+
+# One Simulation per scenario and pool process, built once by _init_worker
+# and reset before every replication. A single scenario is keyed None
+_simulations: dict = None
+_records: ClientRecords = None
+_kpis = False
+_seed = None
+
+
+def _init_worker(scenarios, waiting_room_size, kpis, seed, profile, trace, simulation_kwargs):
+    global _simulations, _records, _kpis, _seed
+
+    _kpis = kpis
+    _seed = seed
+    _records = None if kpis else ClientRecords()
+    _simulations = {
+        name: Simulation(
+            waiting_room_size=waiting_room_size,
+            totem=Totem(),
+            workers=workers,
+            records=_records,
+            keep_clients=False,
+            profiler=SimulationProfiler() if profile else None,
+            trace=TraceRecorder(os.path.join(trace, f'trace-{os.getpid()}.bin'))
+            if trace is not None else None,
+            **simulation_kwargs
+        )
+        for name, workers in scenarios.items()
+    }
+
+
+def replicate(simulation, seed, index, kpis=True):
+    """
+    Replication `index` on a reused Simulation, drawing from the random
+    streams of (seed, index), and its KPI dictionary with `kpis`.
+    """
+    if seed is not None:
+        ClientRandomVar.seed(seed, index)
+
+    if simulation.trace is not None:
+        simulation.trace.simulation = index
+
+    if kpis:
+        simulation.kpis = KPICollector(len(simulation.workers))
+
+    simulation.reset().start().run()
+    return simulation.kpis.kpis() if kpis else None
+
+
+def _run_range(start, stop):
+    """
+    Replications start..stop-1 on the process Simulations, returned as one
+    records array or a list of KPI dictionaries, {scenario: kpis} ones with
+    several scenarios.
+    """
+    began = perf_counter()
+    for s in _simulations.values():
+        if s.profiler is not None:
+            s.profiler = SimulationProfiler()
+
+    if None in _simulations:
+        s = _simulations[None]
+        if _kpis:
+            results = [replicate(s, _seed, index) for index in range(start, stop)]
+        else:
+            _records.clear()
+            for index in range(start, stop):
+                _records.simulation = index
+                replicate(s, _seed, index, kpis=False)
+            results = _records.array.copy()
+    else:
+        # Every scenario replays the same random streams
+        results = [
+            {name: replicate(s, _seed, index) for name, s in _simulations.items()}
+            for index in range(start, stop)
+        ]
+
+    profile = None
+    for s in _simulations.values():
+        if s.profiler is not None:
+            profile = (profile or SimulationProfiler()).merge(s.profiler)
+
+    profile = profile and profile.to_dict()
+    return start, stop, results, os.getpid(), perf_counter() - began, profile
+
+
+def bounded(pool, tasks, window):
+    """
+    Submits the (function, *args) `tasks` to `pool`, `window` of them at
+    most not yet consumed, and yields (result, in flight) as they complete.
+    """
+    tasks = iter(tasks)
+    pending = set()
+
+    while True:
+        pending.update(
+            pool.submit(*task) for task in islice(tasks, window - len(pending))
+        )
+        if not pending:
+            break
+
+        completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in completed:
+            yield future.result(), len(pending)
+
+
+class ReplicationScheduler:
+    """
+    Runs replications on a process pool, `chunk_size` of them per task.
+
+    The scenario (workers, waiting room size) is sent once to every pool
+    process, which builds its Simulation once and reuses it for all its
+    replications. Each task returns the results of its whole range at
+    once: a single records array, or the list of KPI dictionaries with
+    `kpis`.
+
+    With a `seed`, replication i draws from its own random streams (see
+    RandomStreams), so results don't depend on the pool size, the chunk
+    size or which process ran the replication.
+
+    `workers` can be a {scenario: workers} dictionary, with `kpis`: every
+    process then builds a Simulation per scenario, replication i of every
+    scenario replays the same random streams, and its KPIs are a
+    {scenario: kpis} dictionary (see PairedComparison).
+
+    With `profile`, the SimulationProfiler of every process is merged in
+    `profiler`. With a `trace` directory, every process writes the trace of
+    its replications to trace-{pid}.bin there (see metrics.trace).
+
+    Ranges are returned as they complete, with at most `window` of them
+    submitted and not yet consumed, so results are never piled up faster
+    than they are used.
+    """
+
+    def __init__(
+        self,
+        workers,
+        waiting_room_size=20,
+        kpis=False,
+        chunk_size=1000,
+        processes=None,
+        seed=None,
+        profile=False,
+        window=None,
+        trace=None,
+        **simulation_kwargs
+    ):
+        self.chunk_size = chunk_size
+        self.processes = processes or available_cpus()
+        self.window = window or 2 * self.processes
+        self.kpis = kpis
+        self.in_flight = 0
+
+        if isinstance(workers, dict):
+            if not kpis or trace is not None:
+                raise ValueError("several scenarios can only be run for their KPIs")
+            scenarios = workers
+        else:
+            scenarios = {None: workers}
+
+        if trace is not None:
+            os.makedirs(trace, exist_ok=True)
+
+        self.pool = ProcessPoolExecutor(
+            self.processes,
+            initializer=_init_worker,
+            initargs=(
+                scenarios, waiting_room_size, kpis, seed, profile, trace, simulation_kwargs
+            )
+        )
+        self.profiler = SimulationProfiler() if profile else None
+
+        # pid -> [replications, seconds]
+        self.throughput = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def shutdown(self):
+        self.pool.shutdown(True)
+
+    def ranges(self, start, stop, done=()):
+        """Chunks of the replications start..stop-1 not in the `done` ranges"""
+        return [
+            (i, min(i + self.chunk_size, b))
+            for a, b in missing(stop, start, done)
+            for i in range(a, b, self.chunk_size)
+        ]
+
+    def run(self, stop, start=0, done=()):
+        """
+        Yields (start, stop, results) per range, in completion order,
+        skipping the replications of the `done` ranges.
+        """
+        tasks = ((_run_range, a, b) for a, b in self.ranges(start, stop, done))
+
+        for result, in_flight in bounded(self.pool, tasks, self.window):
+            a, b, results, pid, seconds, profile = result
+            self.in_flight = in_flight
+
+            throughput = self.throughput.setdefault(pid, [0, 0.0])
+            throughput[0] += b - a
+            throughput[1] += seconds
+
+            if profile:
+                self.profiler.merge(SimulationProfiler.from_dict(profile))
+
+            yield a, b, results
+
+        self.in_flight = 0
+
+    def report(self):
+        lines = []
+        for i, (pid, (replications, seconds)) in enumerate(sorted(self.throughput.items())):
+            lines.append(
+                f"process {i} (pid {pid}): {replications} replications in "
+                f"{seconds:.1f}s, {replications / seconds if seconds else 0:.1f}/s"
+            )
+
+        replications = sum(r for r, _ in self.throughput.values())
+        lines.append(f"{replications} replications on {self.processes} processes")
+        return '\n'.join(lines)
@@ -0,0 +1,313 @@
+import argparse
+import hashlib
+import itertools
+import json
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from tqdm import tqdm
+
+try:
+    from simulation import Simulation
+    from random_vars import client as ClientRandomVar
+    from entities.totem import Totem
+    from entities.workers import Worker, Seller, ClientSupport, SellerAndClientSupport
+    from runner.scheduler import available_cpus, bounded, replicate
+except ModuleNotFoundError:
+    from src.simulation import Simulation
+    from src.random_vars import client as ClientRandomVar
+    from src.entities.totem import Totem
+    from src.entities.workers import Worker, Seller, ClientSupport, SellerAndClientSupport
+    from src.runner.scheduler import available_cpus, bounded, replicate
+
+
+# Parameters of a design point, with their type and the value used when a
+# design leaves them out
+PARAMETERS = {
+    'sellers': (int, 2),
+    'client_supports': (int, 2),
+    'sellers_and_client_supports': (int, 0),
+    'queue_len': (int, 2),
+    'waiting_room_size': (int, 20),
+    'lunch_start': (float, 12.0),
+    'lunch_step': (float, 0.5),
+    'arrival_multiplier': (float, 1.0),
+}
+
+# Worker type of each count parameter, in the order workers() alternates them
+WORKER_KINDS = {
+    'sellers': Seller,
+    'client_supports': ClientSupport,
+    'sellers_and_client_supports': SellerAndClientSupport,
+}
+
+
+#####################################################################
+# Designs
+####################################################################
+
+def point(**params):
+    """
+    A design point, every parameter set and cast to its type. Raises
+    ValueError when no worker of the point can attend some requirement,
+    whose clients would never finish.
+    """
+    values = {
+        name: kind(params.get(name, default))
+        for name, (kind, default) in PARAMETERS.items()
+    }
+
+    unattended = [
+        requirement for requirement in Worker.requirements
+        if not any(
+            values[name] > 0 and requirement in kind.requirements
+            for name, kind in WORKER_KINDS.items()
+        )
+    ]
+    if unattended:
+        raise ValueError(f"no worker attends requirements {unattended} in {values}")
+
+    return values
+
+
+def point_id(point):
+    return hashlib.sha1(json.dumps(point, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def grid(space):
+    """Every combination of the values of `space`, {parameter: [values]}"""
+    names = list(space)
+    return [
+        point(**dict(zip(names, values)))
+        for values in itertools.product(*(space[name] for name in names))
+    ]
+
+
+def latin_hypercube(space, n, seed=0):
+    """
+    n points of a Latin hypercube over the ranges of `space`, from the min
+    to the max of the values of each parameter. Each range is split in n
+    strata and every stratum is sampled once; integer parameters are
+    rounded. Raises ValueError when the lowest worker counts leave some
+    requirement without a worker, see point().
+    """
+    # Fewer workers never attend more requirements, so if the lowest
+    # counts are valid every sampled point is
+    point(**{name: min(values) for name, values in space.items()})
+
+    rng = np.random.default_rng(seed)
+
+    points = [{} for _ in range(n)]
+    for name, values in space.items():
+        low, high = min(values), max(values)
+        samples = (rng.permutation(n) + rng.random(n)) / n
+        samples = low + samples * (high - low)
+
+        if PARAMETERS[name][0] is int:
+            samples = np.rint(samples)
+
+        for p, value in zip(points, samples):
+            p[name] = value
+
+    return [point(**p) for p in points]
+
+
+def workers(point):
+    """
+    The office of a design point. The worker types alternate as in run.py
+    options, and lunch times start at `lunch_start`, one every `lunch_step`
+    hours.
+    """
+    kinds = [[kind] * point[name] for name, kind in WORKER_KINDS.items()]
+    order = [
+        kind for kinds_ in itertools.zip_longest(*kinds)
+        for kind in kinds_ if kind is not None
+    ]
+
+    return [
+        kind(point['lunch_start'] + i * point['lunch_step'], queue_len=point['queue_len'])
+        for i, kind in enumerate(order)
+    ]
+
+
+#####################################################################
+# Pool Tasks
+####################################################################
+
+# The Simulations of the design points run by this process, reset before
+# every replication
+_simulations = {}
+
+
+def _run_range(point, start, stop, seed):
+    """KPIs of replications start..stop-1 of a design point"""
+    key = point_id(point)
+    if key not in _simulations:
+        if len(_simulations) >= 16:
+            _simulations.clear()
+
+        _simulations[key] = Simulation(
+            waiting_room_size=point['waiting_room_size'],
+            totem=Totem(),
+            workers=workers(point),
+            keep_clients=False
+        )
+
+    s = _simulations[key]
+    ClientRandomVar.set_arrival_multiplier(point['arrival_multiplier'])
+
+    return key, [(index, replicate(s, seed, index)) for index in range(start, stop)]
+
+
+#####################################################################
+# Store
+####################################################################
+
+class SweepStore:
+    """
+    SQLite file with the design points and the KPIs of every replication,
+    indexed by point and replication.
+    """
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS points (
+                point_id TEXT PRIMARY KEY,
+                params TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS replications (
+                point_id TEXT NOT NULL REFERENCES points (point_id),
+                replication INTEGER NOT NULL,
+                kpis TEXT NOT NULL,
+                PRIMARY KEY (point_id, replication)
+            );
+        """)
+
+    def close(self):
+        self.connection.close()
+
+    def add_points(self, points):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO points VALUES (?, ?)",
+                [(point_id(p), json.dumps(p, sort_keys=True)) for p in points]
+            )
+
+    def done(self, key):
+        """Replications of the point already in the store"""
+        return {
+            replication for replication, in self.connection.execute(
+                "SELECT replication FROM replications WHERE point_id = ?", (key,)
+            )
+        }
+
+    def add_results(self, key, results):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO replications VALUES (?, ?, ?)",
+                [(key, index, json.dumps(kpis)) for index, kpis in results]
+            )
+
+    def load(self, point_id=None):
+        """One row per replication, the point parameters then its KPIs"""
+        import pandas as pd
+
+        query = """
+            SELECT points.point_id, params, replication, kpis
+            FROM replications JOIN points USING (point_id)
+        """
+        args = ()
+        if point_id is not None:
+            query += " WHERE point_id = ?"
+            args = (point_id,)
+
+        return pd.DataFrame([
+            {
+                "point_id": key,
+                **json.loads(params),
+                "replication": replication,
+                **json.loads(kpis),
+            }
+            for key, params, replication, kpis in self.connection.execute(query, args)
+        ])
+
+
+def ranges(replications, chunk_size):
+    """Consecutive runs of the sorted replications, chunk_size at most"""
+    replications = sorted(replications)
+    for _, run in itertools.groupby(
+        enumerate(replications), key=lambda item: item[1] - item[0]
+    ):
+        run = [replication for _, replication in run]
+        for i in range(0, len(run), chunk_size):
+            chunk = run[i:i + chunk_size]
+            yield chunk[0], chunk[-1] + 1
+
+
+def sweep(
+    points, replications, store, seed=123456, chunk_size=100, processes=None, window=None
+):
+    """
+    Runs `replications` replications of every design point on one process
+    pool, writing their KPIs to `store` as they complete. Replications
+    already in the store are skipped. Replication i of every point uses the
+    random streams of (seed, i), common random numbers across the design.
+    At most `window` ranges, twice the processes by default, are submitted
+    and not yet written (see scheduler.bounded).
+    """
+    store.add_points(points)
+
+    tasks = []
+    for p in points:
+        missing = set(range(replications)) - store.done(point_id(p))
+        tasks.extend((p, start, stop) for start, stop in ranges(missing, chunk_size))
+
+    total = sum(stop - start for _, start, stop in tasks)
+    processes = processes or available_cpus()
+    with ProcessPoolExecutor(processes) as pool, tqdm(total=total) as progress:
+        tasks = ((_run_range, p, start, stop, seed) for p, start, stop in tasks)
+
+        for (key, results), _ in bounded(pool, tasks, window or 2 * processes):
+            store.add_results(key, results)
+            progress.update(len(results))
+
+    return total
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--store", default="sweep.db")
+    parser.add_argument("--design", choices=('grid', 'lhs'), default='grid')
+    parser.add_argument("--points", type=int, default=20,
+                        help="points of the Latin hypercube design")
+    parser.add_argument("--replications", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=123456)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--window", type=int, default=None,
+                        help="ranges submitted and not yet written, twice the "
+                             "processes by default")
+
+    # Values of a grid, or the range of a Latin hypercube
+    for name, (kind, default) in PARAMETERS.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=kind, nargs='+', default=[default]
+        )
+
+    args = parser.parse_args()
+
+    space = {name: getattr(args, name) for name in PARAMETERS}
+    if args.design == 'grid':
+        points = grid(space)
+    else:
+        points = latin_hypercube(space, args.points, args.seed)
+
+    store = SweepStore(args.store)
+    run = sweep(
+        points, args.replications, store, args.seed, args.chunk_size, args.processes,
+        args.window
+    )
+    print(f"{len(points)} points, {run} replications run")
+    store.close()
@@ -1,40 +1,59 @@
-import time
-import os
+from math import inf
 import argparse
-import pandas as pd
-
-from functools import singledispatchmethod
 
 try:
     from random_vars import client as ClientRandomVar
-    from utils.formatter import formatear_moneda
 
     from events.client_arrive import ClientArriveEvent
     from events.client_leave_totem import ClientLeaveTotemEvent
     from events.worker_return_to_work import WorkerReturnToWork
     from events.space_in_waiting_room import FeeSpaceInWaitingRoomEvent
     from events.client_leave import ClientLeave
+    from events.client_leakage import ClientLeakageEvent
+    from events.calendar import make_calendar
+    from events.base import EventKind
+    from invariants import InvariantChecker
 
     from entities.totem import Totem, TotemStatus
     from entities.client import ClientType, Client
+    from entities.waiting_room import WaitingRoom
+    from entities.records import ClientRecords
+    from metrics.collector import KPICollector
+    from metrics.profiler import SimulationProfiler
+    from metrics.trace import TraceRecorder, TracePrinter, TraceFormat
     from entities.workers import Worker, WorkerStatus
     from entities.workers import Seller, SellerAndClientSupport, ClientSupport
 except ModuleNotFoundError:
     from src.random_vars import client as ClientRandomVar
-    from src.utils.formatter import formatear_moneda
 
     from src.events.client_arrive import ClientArriveEvent
     from src.events.client_leave_totem import ClientLeaveTotemEvent
     from src.events.worker_return_to_work import WorkerReturnToWork
     from src.events.space_in_waiting_room import FeeSpaceInWaitingRoomEvent
     from src.events.client_leave import ClientLeave
+    from src.events.client_leakage import ClientLeakageEvent
+    from src.events.calendar import make_calendar
+    from src.events.base import EventKind
+    from src.invariants import InvariantChecker
 
     from src.entities.totem import Totem, TotemStatus
     from src.entities.client import ClientType, Client
+    from src.entities.waiting_room import WaitingRoom
+    from src.entities.records import ClientRecords
+    from src.metrics.collector import KPICollector
+    from src.metrics.profiler import SimulationProfiler
+    from src.metrics.trace import TraceRecorder, TracePrinter, TraceFormat
     from src.entities.workers import Worker, WorkerStatus
     from src.entities.workers import Seller, SellerAndClientSupport, ClientSupport
 
 
+class LeakageModel:
+    # Each passive action draws whether the waiting clients have left
+    POLLING = 'polling'
+    # The leakage time is drawn once, when the client joins a queue
+    SCHEDULED = 'scheduled'
+
+
 class Simulation:
     def __init__(
         self,
@@ -42,26 +61,98 @@ class Simulation:
         totem: Totem,
         workers: list[Worker],
         start_hour=9,
-        end_hour=18
+        end_hour=18,
+        calendar='heap',
+        leakage=LeakageModel.POLLING,
+        records: ClientRecords = None,
+        kpis: KPICollector = None,
+        keep_clients=True,
+        profiler=None,
+        audit_every=None,
+        trace=None
     ):
 
         # Simulation Configuration
-        self.clock = start_hour
+        self.start_hour = start_hour
         self.end_hour = end_hour
         self.waiting_room_size = waiting_room_size
         self.workers = workers
         self.totem = totem
-
-        # Simulation Queues
-        self.waiting_room: set[Client] = set()
-        self.totem_waiting_list: list[Client] = []
+        self.leakage = leakage
 
         # Simulation Event Tools
-        self.events = []
+        # calendar: 'heap', 'calendar', 'ladder' or an EventCalendar instance
+        self.events = make_calendar(calendar)
 
         # Simulation Memory
+        # Clients are written to `records` and counted in `kpis` as they
+        # leave the system, and only kept in `clients` if `keep_clients`
+        self.records = records
+        self.kpis = kpis
+        self.keep_clients = keep_clients
+
+        # Optional metrics.profiler.SimulationProfiler, None costs one check
+        # per event
+        self.profiler = profiler
+
+        # Optional metrics.trace.TraceRecorder, a record per event
+        self.trace = trace
+
+        # Passive Actions Subscriptions
+        # Only the entities whose inputs changed since their last passive
+        # action are woken up, workers by index and only for the client
+        # requirements they can attend
+        self.worker_index = {worker: i for i, worker in enumerate(workers)}
+        self.subscribers = {
+            requirement: [
+                i for i, worker in enumerate(workers)
+                if requirement in worker.requirements
+            ]
+            for requirement in (1, 2, 3)
+        }
+
+        # Event Handlers, indexed by Event.kind
+        self.handlers = [None] * EventKind.COUNT
+        self.handlers[EventKind.CLIENT_ARRIVE] = self._client_arrive
+        self.handlers[EventKind.CLIENT_LEAVE_TOTEM] = self._client_leave_totem
+        self.handlers[EventKind.CLIENT_LEAVE] = self._client_leave
+        self.handlers[EventKind.FEE_SPACE_IN_WAITING_ROOM] = self._fee_space_in_waiting_room
+        self.handlers[EventKind.CLIENT_LEAKAGE] = self._client_leakage
+        self.handlers[EventKind.WORKER_RETURN_TO_WORK] = self._worker_return_to_work
+
+        # Incremental test rules after every event, with a full audit every
+        # `audit_every` events (0 never audits)
+        self.checker = None if audit_every is None else \
+            InvariantChecker(self, audit_every)
+
+        self.reset()
+
+    def reset(self):
+        """
+        Back to the start hour with empty queues, so the same Simulation,
+        and its entities, can run another replication. The records and kpis
+        are left to the caller.
+        """
+        self.clock = self.start_hour
+        self.totem.reset()
+        for worker in self.workers:
+            worker.reset()
+
+        # Simulation Queues
+        self.waiting_room = WaitingRoom(self.waiting_room_size)
+        self.totem_waiting_list: list[Client] = []
+
+        self.events.clear()
         self.clients = []
 
+        if self.checker is not None:
+            self.checker.reset()
+
+        self.awake_workers = set()
+        self.awake_totem = False
+
+        return self
+
     #####################################################################
     # Simulation Test Rules
     ####################################################################
@@ -121,73 +212,131 @@ class Simulation:
 
         return self
 
-    def run(self, delay=None, verbose=False, testing=False):
+    def run(self, delay=None, verbose=False, testing=False, until=None):
+        # With `until`, the events later than it are left in the calendar
+        until = inf if until is None else until
+        profiler = self.profiler
+        checker = self.checker
+        handlers = self.handlers
+        worker_passive = self._worker_passive
+        totem_passive = self._totem_passive
+        if profiler is not None:
+            profiler.begin(self)
+            def worker_passive(worker): return profiler.passive_event(self, worker)
+            def totem_passive(totem): return profiler.passive_event(self, totem)
+
+        # verbose prints the trace records as they are recorded, instead of
+        # writing them to the `trace` of the Simulation
+        trace = TracePrinter(delay) if verbose else self.trace
+        if trace is not None:
+            trace.begin(self)
+
         while len(self.events) != 0:
-            self.events.sort()
-            event = self.events.pop(0)
+            event = self.events.pop()
+            if event.time > until:
+                self.events.push(event)
+                break
 
             # The office door closes at the end hour, so, new client cannot arrive
-            if self.end_hour < self.clock and isinstance(event, ClientArriveEvent):
+            if self.end_hour < self.clock and event.kind == EventKind.CLIENT_ARRIVE:
                 continue
 
             self.clock = event.time
-            self.run_event(event)
-            if verbose:
-                output = f"Clock: {self.clock} --> {event}\n"
-                output += f"Waiting Room ({len(self.waiting_room)}/{self.waiting_room_size}): {[str(client) for client in self.waiting_room]}\n"
-                output += f"Totem Waiting Room ({len(self.totem_waiting_list)}): {'I'* len(self.totem_waiting_list)}\n"
-                output += ''.join([
-                    f"Monitor Worker({i}): {[str(client) if client else 'Empty' for client in worker.queue]}\n"
-                    for i, worker in enumerate(self.workers)
-                ])
-                output += f"Events Queue: {[str(event) for event in self.events]}\n"
-                output += "---------------------------------------------------------------------------------------------------------"
-
-                print(output)
-                # if delay is not None:
-                #     time.sleep(delay)
-                #     print("\033[F" * (10), end='')
-
-                if delay is not None:
-                    time.sleep(delay)
-                    # clear_output(wait=True)
-                    os.system('cls' if os.name == 'nt' else 'clear')
+            if profiler is None:
+                handlers[event.kind](event)
+            else:
+                profiler.run_event(self, event)
 
             # Run Passive Actions
-            for worker in self.workers:
-                self.passive_event(worker)
+            if self.awake_workers:
+                for index in sorted(self.awake_workers):
+                    worker_passive(self.workers[index])
+
+                if checker is not None:
+                    checker.touched.update(self.awake_workers)
+                self.awake_workers.clear()
+
+            if self.awake_totem:
+                self.awake_totem = False
+                totem_passive(self.totem)
+
+            if trace is not None:
+                trace.record(self, event)
 
-            self.passive_event(self.totem)
+            if checker is not None:
+                checker.check(event)
 
             if testing:
-                self.test_rules()
+                if profiler is None:
+                    self.test_rules()
+                else:
+                    profiler.test_rules(self)
+
+        if profiler is not None:
+            profiler.end(self)
+
+        if trace is not None:
+            trace.end(self)
+
+        return self
+
+    def carry_over(self):
+        """
+        Moves a day stopped at the end hour, `run(until=end_hour)`, to the
+        start hour of the next day. The pending arrivals are dropped and the
+        other events, and the clients still in the system, are shifted back
+        by the opening hours, so the night does not count as waiting time.
+        Workers can go to lunch again.
+        """
+        shift = self.end_hour - self.start_hour
+
+        events = [event for event in self.events if event.kind != EventKind.CLIENT_ARRIVE]
+        self.events.clear()
+
+        clients = {event.client for event in events if hasattr(event, 'client')}
+        clients.update(self.totem_waiting_list)
+        clients.update(self.waiting_room)
+        for worker in self.workers:
+            clients.update(worker.clients())
+            worker.have_launch = False
 
-        if verbose:
-            print(output)
+        for client in clients:
+            client.arrive_time -= shift
+            if client.waiting_room_arrive_time is not None:
+                client.waiting_room_arrive_time -= shift
+            if client.attention_start_time is not None:
+                client.attention_start_time -= shift
 
+        for event in events:
+            event.time -= shift
+            self.events.push(event)
+
+        self.clock = self.start_hour
         return self
 
     #####################################################################
     # Event Handlers
     ####################################################################
 
-    @singledispatchmethod
-    def run_event(self):
-        pass
+    def run_event(self, event):
+        self.handlers[event.kind](event)
 
-    @run_event.register
-    def _(self, event: ClientArriveEvent):
+    def _client_arrive(self, event: ClientArriveEvent):
         # Add the new client to the totem waiting list
         self.totem_waiting_list.append(event.client)
+        self.awake_totem = True
 
         # Save the new client for computing final results
-        self.clients.append(event.client)
+        if self.keep_clients:
+            self.clients.append(event.client)
+
+        if self.leakage == LeakageModel.SCHEDULED:
+            self.dispatch(ClientLeakageEvent, event.client)
 
         # Generate the new client arrive event with the same client arrive
         self.dispatch(ClientArriveEvent, event.client.type)
 
-    @run_event.register
-    def _(self, event: ClientLeaveTotemEvent):
+    def _client_leave_totem(self, event: ClientLeaveTotemEvent):
         client = event.client
 
         # Update client's info
@@ -196,18 +345,24 @@ class Simulation:
 
         # Add client to waiting room
         self.waiting_room.add(client)
+        self.awake_totem = True
+        self.awake_workers.update(self.subscribers[client.requirement])
+
+        if self.leakage == LeakageModel.SCHEDULED:
+            self.dispatch(ClientLeakageEvent, client, waiting_room=True)
 
         # If the waiting room is full the totem should be stopped
-        if len(self.waiting_room) >= self.waiting_room_size:
+        if self.waiting_room.full:
             self.totem.stop()
 
-    @run_event.register
-    def _(self, event: ClientLeave):
+    def _client_leave(self, event: ClientLeave):
         worker = event.worker
         event.client.leave_time = self.clock
-        event.client.worker_helper = self.workers.index(worker)
+        event.client.worker_helper = self.worker_index[worker]
+        self.finish(event.client)
 
         worker.free()
+        self.awake_workers.add(event.client.worker_helper)
 
         if worker.go_to_launch(self.clock):
             self.dispatch(WorkerReturnToWork, worker)
@@ -216,14 +371,33 @@ class Simulation:
         if (next_client := worker.next()):
             self.dispatch(ClientLeave, next_client, worker=worker)
 
-    @run_event.register
-    def _(self, event: FeeSpaceInWaitingRoomEvent):
+    def _fee_space_in_waiting_room(self, event: FeeSpaceInWaitingRoomEvent):
         if self.totem.status == TotemStatus.STOPPED:
             self.totem.start()
+            self.awake_totem = True
+
+    def _client_leakage(self, event: ClientLeakageEvent):
+        client = event.client
+
+        if event.waiting_room:
+            if client not in self.waiting_room:
+                return
+
+            client.leakage_time = self.clock
+            self.waiting_room.remove(client)
+            self.dispatch(FeeSpaceInWaitingRoomEvent)
+            self.finish(client)
 
-    @run_event.register
-    def _(self, event: WorkerReturnToWork):
+        # The client is still in the totem waiting list until the totem
+        # assigns it a requirement, it is dropped from the list lazily
+        elif client.requirement is None and client.leakage_time is None:
+            client.price = ClientRandomVar.leakage_cost(client)
+            client.leakage_time = self.clock
+            self.finish(client)
+
+    def _worker_return_to_work(self, event: WorkerReturnToWork):
         event.worker.start()
+        self.awake_workers.add(self.worker_index[event.worker])
 
         if (next_client := event.worker.next()):
             self.dispatch(ClientLeave, next_client, worker=event.worker)
@@ -232,26 +406,34 @@ class Simulation:
     # Passive Actions
     ####################################################################
 
-    @singledispatchmethod
-    def passive_event(self):
-        pass
+    def passive_event(self, entity):
+        if isinstance(entity, Totem):
+            self._totem_passive(entity)
+        else:
+            self._worker_passive(entity)
 
-    @passive_event.register
-    def _(self, totem: Totem):
+    def _totem_passive(self, totem: Totem):
         if totem.status != TotemStatus.FREE:
             return
 
         # Before a new client moves to the totem
         # the totem waiting list must be cleaned to drop
         # each client who have left
-        while self.totem_waiting_list and \
-                ClientRandomVar.leakage_from_totem_waiting_list(
-                    self.totem_waiting_list[0], self.clock
-                ):
-
-            client = self.totem_waiting_list.pop(0)
-            client.price = ClientRandomVar.leakage_cost(client)
-            client.leakage_time = self.clock
+        if self.leakage == LeakageModel.SCHEDULED:
+            while self.totem_waiting_list and \
+                    self.totem_waiting_list[0].leakage_time is not None:
+                self.totem_waiting_list.pop(0)
+
+        else:
+            while self.totem_waiting_list and \
+                    ClientRandomVar.leakage_from_totem_waiting_list(
+                        self.totem_waiting_list[0], self.clock
+                    ):
+
+                client = self.totem_waiting_list.pop(0)
+                client.price = ClientRandomVar.leakage_cost(client)
+                client.leakage_time = self.clock
+                self.finish(client)
 
         # After the cleaning if there are clients in it yet
         # then the first moves to the totem
@@ -260,25 +442,17 @@ class Simulation:
             self.totem.get_client(client)
             self.dispatch(ClientLeaveTotemEvent, client)
 
-    @passive_event.register
-    def _(self, worker: Worker):
+    def _worker_passive(self, worker: Worker):
         if worker.status == WorkerStatus.EATING:
             return
 
-        if not self.waiting_room:
-            return
-
         if worker.monitor_full():
             return
 
-        clients = [c for c in self.waiting_room if worker.can_help(c)]
-        clients.sort()
-
         free_new_space = False
-        while clients:
-            client = clients.pop(0)
-
-            if not ClientRandomVar.leakage_from_waiting_room(client, self.clock):
+        while (client := self.waiting_room.pop(worker.requirements)):
+            if self.leakage == LeakageModel.SCHEDULED or \
+                    not ClientRandomVar.leakage_from_waiting_room(client, self.clock):
                 start_attention = worker.call(client)
 
                 if start_attention:
@@ -287,8 +461,8 @@ class Simulation:
 
             else:
                 client.leakage_time = self.clock
+                self.finish(client)
 
-            self.waiting_room.remove(client)
             free_new_space = True
 
             if worker.monitor_full():
@@ -307,24 +481,61 @@ class Simulation:
         except IndexError:
             return self.workers[worker_index - len(self.workers)]
 
+    def finish(self, client):
+        # The client left the system, its record is complete
+        if self.records is not None:
+            self.records.append(client)
+
+        if self.kpis is not None:
+            self.kpis.observe(client)
+
     def dispatch(self, new_event, *args, **kwargs):
-        self.events.append(new_event.generate(self.clock, *args, **kwargs))
+        self.events.push(new_event.generate(self.clock, *args, **kwargs))
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--delay", type=float, default=None)
     parser.add_argument("--q_len", type=int, default=2)
+    parser.add_argument("--waiting_room_size", type=int, default=20)
+    parser.add_argument("--calendar", default='heap')
+    parser.add_argument("--leakage", default=LeakageModel.POLLING)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--replication", type=int, default=0,
+                        help="with --seed, the replication of run.py to replay")
+    parser.add_argument("--profile", action='store_true')
+    parser.add_argument("--audit-every", type=int, default=None,
+                        help="incremental test rules, with a full audit every "
+                             "AUDIT_EVERY events, instead of the full test rules "
+                             "after every event")
+    parser.add_argument("--trace", default=None,
+                        help="write the trace to this file instead of printing "
+                             "it, replay it with python -m src.metrics.trace")
+    parser.add_argument("--trace-format", default=TraceFormat.BINARY,
+                        choices=(TraceFormat.BINARY, TraceFormat.NDJSON))
 
     args = parser.parse_args()
 
+    if args.seed is not None:
+        ClientRandomVar.seed(args.seed, args.replication)
+
     s = Simulation(
-        waiting_room_size=20,
+        waiting_room_size=args.waiting_room_size,
         totem=Totem(),
         workers=[
             Seller(12, queue_len=args.q_len),
             ClientSupport(12.5, queue_len=args.q_len),
             Seller(13, queue_len=args.q_len),
             ClientSupport(13.5, queue_len=args.q_len)
-        ]
-    ).start().run(args.delay, verbose=True, testing=True)
+        ],
+        calendar=args.calendar,
+        leakage=args.leakage,
+        profiler=SimulationProfiler() if args.profile else None,
+        audit_every=args.audit_every,
+        trace=TraceRecorder(args.trace, args.trace_format) if args.trace else None
+    ).start().run(
+        args.delay, verbose=args.trace is None, testing=args.audit_every is None
+    )
+
+    if s.profiler is not None:
+        print(s.profiler.format())
@@ -0,0 +1,470 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+try:
+    from random_vars import client as ClientRandomVar
+    from entities.client import ClientType
+    from entities.waiting_room import WaitingRoom
+    from entities.workers import Worker
+    from entities.workers import Seller, ClientSupport
+except ModuleNotFoundError:
+    from src.random_vars import client as ClientRandomVar
+    from src.entities.client import ClientType
+    from src.entities.waiting_room import WaitingRoom
+    from src.entities.workers import Worker
+    from src.entities.workers import Seller, ClientSupport
+
+
+# Client type codes
+TYPES = [ClientType.A, ClientType.B, ClientType.C]
+
+# Totem status codes
+TOTEM_FREE, TOTEM_WORKING, TOTEM_STOPPED = 0, 1, 2
+
+# Worker status codes
+WORKER_FREE, WORKER_WORKING, WORKER_EATING = 0, 1, 2
+
+EMPTY = -1
+
+
+class VectorizedSimulation:
+    """
+    N independent replications of Simulation advanced in lock step.
+
+    The state is a struct of arrays, one row per replication: clock, totem,
+    waiting room slots, worker monitors and the client table. Each step
+    every replication runs its own next event, the events of a kind being
+    handled at once for all the replications where it is due, and every
+    random variate of a step is drawn in a batch from one Generator.
+
+    Simulation stays the reference implementation, this engine follows its
+    rules (polling leakage) and is checked against it in distribution,
+    not event by event: see `compare`.
+    """
+
+    # Time table columns, next event of each kind for each replication
+    ARRIVAL = 0
+    TOTEM = 3
+    FINISH = 4
+
+    def __init__(
+        self,
+        n,
+        waiting_room_size,
+        workers: list[Worker],
+        start_hour=9,
+        end_hour=18,
+        seed=None,
+        capacity=512
+    ):
+        self.n = n
+        self.end_hour = end_hour
+        self.waiting_room_size = waiting_room_size
+        self.workers = workers
+        self.rng = np.random.default_rng(seed)
+
+        # Configuration tables
+        self._setup_random_vars()
+        self.lunch = np.array([w.launch_time_start for w in workers])
+        self.can_help = np.array([
+            [requirement in w.requirements for requirement in range(4)]
+            for w in workers
+        ])
+        self.RETURN = self.FINISH + len(workers)
+        self.priority = np.array(
+            [0] + [WaitingRoom.PRIORITY[requirement] for requirement in (1, 2, 3)]
+        )
+
+        # Simulation State
+        self.clock = np.full(n, float(start_hour))
+        self.times = np.full((n, self.RETURN + len(workers)), np.inf)
+
+        self.totem_status = np.full(n, TOTEM_FREE)
+        self.totem_client = np.full(n, EMPTY)
+        self.totem_head = np.zeros(n, dtype=int)
+        self.totem_counter = np.zeros((n, len(TYPES)), dtype=int)
+
+        self.room_client = np.full((n, waiting_room_size), EMPTY)
+        self.room_requirement = np.zeros((n, waiting_room_size), dtype=int)
+        self.room_key = np.full((n, waiting_room_size), np.inf)
+
+        self.worker_status = np.full((n, len(workers)), WORKER_FREE)
+        self.have_launch = np.zeros((n, len(workers)), dtype=bool)
+        self.queues = [np.full((n, len(w.queue)), EMPTY) for w in workers]
+
+        # Simulation Memory
+        self.n_clients = np.zeros(n, dtype=int)
+        self.capacity = 0
+        self._reserve(capacity)
+
+    def _setup_random_vars(self):
+        rvars = [ClientRandomVar.get_random_var(t) for t in TYPES]
+
+        def requirement_vars(name):
+            return [
+                getattr(getattr(rvar, f'RequirementType{requirement}', None), name, None)
+                for rvar in rvars for requirement in (1, 2, 3)
+            ]
+
+        self.arrival_vars = [
+            [rvar.MorningArrival, rvar.NoonArrival, rvar.EveningArrival]
+            for rvar in rvars
+        ]
+        self.totem_vars = [rvar.LeaveTotem for rvar in rvars]
+        self.requirement_vars = [rvar.RequirementType for rvar in rvars]
+        self.attention_vars = requirement_vars('AttentionTime')
+        self.price_vars = requirement_vars('Price')
+
+        self.totem_leakage = np.array([
+            rvar.TotemWaitingListLeakage.dist_params[0] for rvar in rvars
+        ])
+        self.room_leakage = np.array([
+            rvar.WaitingRoomLeakage.dist_params[0] for rvar in rvars
+        ])
+        self.leakage_cost = np.array([
+            rvar.LeakageCost.generate() for rvar in rvars
+        ])
+
+    def _reserve(self, size):
+        if size <= self.capacity:
+            return
+
+        capacity = max(size, 2 * self.capacity)
+        pad = capacity - self.capacity
+
+        def grow(name, dtype, fill):
+            block = np.full((self.n, pad), fill, dtype=dtype)
+            if self.capacity:
+                block = np.concatenate([getattr(self, name), block], axis=1)
+            setattr(self, name, block)
+
+        grow('client_type', np.int8, EMPTY)
+        grow('client_requirement', np.int8, 0)
+        grow('client_ticker', float, np.nan)
+        for name in (
+            'arrive_time', 'waiting_room_arrive_time', 'attention_start_time',
+            'price', 'leave_time', 'leakage_time', 'worker_helper'
+        ):
+            grow(name, float, np.nan)
+
+        self.capacity = capacity
+
+    #####################################################################
+    # Simulation Main Methods
+    ####################################################################
+
+    def start(self):
+        everyone = np.arange(self.n)
+        for k in range(len(TYPES)):
+            self._schedule_arrival(everyone, k)
+
+        return self
+
+    def run(self):
+        everyone = np.arange(self.n)
+
+        while True:
+            kind = self.times.argmin(axis=1)
+            time = self.times[everyone, kind]
+
+            rows = np.flatnonzero(time < np.inf)
+            if not len(rows):
+                break
+
+            kind, time = kind[rows], time[rows]
+            self.times[rows, kind] = np.inf
+
+            # The office door closes at the end hour, so, new client cannot arrive
+            late = (kind < self.TOTEM) & (self.clock[rows] > self.end_hour)
+            rows, kind, time = rows[~late], kind[~late], time[~late]
+
+            self.clock[rows] = time
+            for k in np.unique(kind):
+                self._run_event(k, rows[kind == k])
+
+            # Run Passive Actions
+            self._workers_passive(rows)
+            self._totem_passive(rows)
+
+        return self
+
+    #####################################################################
+    # Event Handlers
+    ####################################################################
+
+    def _run_event(self, kind, rows):
+        if kind < self.TOTEM:
+            self._client_arrive(rows, kind)
+        elif kind == self.TOTEM:
+            self._client_leave_totem(rows)
+        elif kind < self.RETURN:
+            self._client_leave(rows, kind - self.FINISH)
+        else:
+            self._worker_return_to_work(rows, kind - self.RETURN)
+
+    def _client_arrive(self, rows, k):
+        self._reserve(self.n_clients[rows].max() + 1)
+
+        client = self.n_clients[rows]
+        self.client_type[rows, client] = k
+        self.arrive_time[rows, client] = self.clock[rows]
+        self.n_clients[rows] += 1
+
+        self._schedule_arrival(rows, k)
+
+    def _schedule_arrival(self, rows, k):
+        time = self.clock[rows]
+        period = np.where(
+            (8 <= time) & (time < 12), 0, np.where((12 <= time) & (time < 14), 1, 2)
+        )
+
+        self.times[rows, self.ARRIVAL + k] = time + self._draw(self.arrival_vars[k], period)
+
+    def _client_leave_totem(self, rows):
+        client = self.totem_client[rows]
+        types = self.client_type[rows, client]
+        requirement = self.client_requirement[rows, client]
+
+        self.waiting_room_arrive_time[rows, client] = self.clock[rows]
+        self.totem_counter[rows, types] += 1
+        self.client_ticker[rows, client] = self.totem_counter[rows, types]
+
+        slot = np.argmax(self.room_client[rows] == EMPTY, axis=1)
+        self.room_client[rows, slot] = client
+        self.room_requirement[rows, slot] = requirement
+        self.room_key[rows, slot] = self.priority[requirement] * 1000 + self.arrive_time[rows, client]
+
+        # If the waiting room is full the totem should be stopped
+        full = (self.room_client[rows] != EMPTY).all(axis=1)
+        self.totem_status[rows] = np.where(full, TOTEM_STOPPED, TOTEM_FREE)
+
+    def _client_leave(self, rows, w):
+        client = self.queues[w][rows, 0]
+        self.leave_time[rows, client] = self.clock[rows]
+        self.worker_helper[rows, client] = w
+        self.worker_status[rows, w] = WORKER_FREE
+
+        launch = ~self.have_launch[rows, w] & (self.clock[rows] > self.lunch[w])
+        eating = rows[launch]
+        self.have_launch[eating, w] = True
+        self.worker_status[eating, w] = WORKER_EATING
+        self.times[eating, self.RETURN + w] = self.clock[eating] + 1
+
+        self._next(rows[~launch], w)
+
+    def _worker_return_to_work(self, rows, w):
+        self.worker_status[rows, w] = WORKER_FREE
+        self._next(rows, w)
+
+    #####################################################################
+    # Passive Actions
+    ####################################################################
+
+    def _workers_passive(self, rows):
+        free_new_space = np.zeros(self.n, dtype=bool)
+
+        for w, queue in enumerate(self.queues):
+            active = rows
+            while len(active):
+                active = active[
+                    (self.worker_status[active, w] != WORKER_EATING) &
+                    (queue[active, -1] == EMPTY)
+                ]
+
+                keys = np.where(
+                    self.can_help[w][self.room_requirement[active]],
+                    self.room_key[active],
+                    np.inf
+                )
+                slot = keys.argmin(axis=1)
+                found = keys[np.arange(len(active)), slot] < np.inf
+                active, slot = active[found], slot[found]
+
+                client = self.room_client[active, slot]
+                self.room_client[active, slot] = EMPTY
+                self.room_requirement[active, slot] = 0
+                self.room_key[active, slot] = np.inf
+                free_new_space[active] = True
+
+                leakage = self._leakage(
+                    self.room_leakage, active, client, self.waiting_room_arrive_time
+                )
+                self.leakage_time[active[leakage], client[leakage]] = self.clock[active[leakage]]
+
+                called, client = active[~leakage], client[~leakage]
+                index = (queue[called] != EMPTY).sum(axis=1)
+                queue[called, index] = client
+
+                start = (index == 0) & (self.worker_status[called, w] == WORKER_FREE)
+                self._start_attention(called[start], w)
+
+        restart = free_new_space & (self.totem_status == TOTEM_STOPPED)
+        self.totem_status[restart] = TOTEM_FREE
+
+    def _totem_passive(self, rows):
+        active = rows
+        while True:
+            active = active[
+                (self.totem_status[active] == TOTEM_FREE) &
+                (self.totem_head[active] < self.n_clients[active])
+            ]
+            if not len(active):
+                return
+
+            client = self.totem_head[active]
+            self.totem_head[active] += 1
+            types = self.client_type[active, client]
+
+            leakage = self._leakage(
+                self.totem_leakage, active, client, self.arrive_time
+            )
+            left, left_client = active[leakage], client[leakage]
+            self.price[left, left_client] = self.leakage_cost[types[leakage]]
+            self.leakage_time[left, left_client] = self.clock[left]
+
+            taken, client, types = active[~leakage], client[~leakage], types[~leakage]
+            self.totem_status[taken] = TOTEM_WORKING
+            self.totem_client[taken] = client
+            self.client_requirement[taken, client] = self._draw(self.requirement_vars, types)
+            self.times[taken, self.TOTEM] = self.clock[taken] + \
+                self._draw(self.totem_vars, types) / 3600
+
+    #####################################################################
+    # Tools
+    #####################################################################
+
+    def _next(self, rows, w):
+        queue = self.queues[w]
+        queue[rows, :-1] = queue[rows, 1:]
+        queue[rows, -1] = EMPTY
+
+        self._start_attention(rows[queue[rows, 0] != EMPTY], w)
+
+    def _start_attention(self, rows, w):
+        client = self.queues[w][rows, 0]
+        codes = self.client_type[rows, client] * 3 + \
+            self.client_requirement[rows, client] - 1
+
+        self.worker_status[rows, w] = WORKER_WORKING
+        self.attention_start_time[rows, client] = self.clock[rows]
+        self.price[rows, client] = self._draw(self.price_vars, codes)
+        self.times[rows, self.FINISH + w] = self.clock[rows] + \
+            self._draw(self.attention_vars, codes)
+
+    def _leakage(self, p, rows, client, since):
+        t = np.rint((self.clock[rows] - since[rows, client]) * 60)
+        prob = np.where(t < 1, 1.0, (1 - p[self.client_type[rows, client]]) ** t)
+
+        return self.rng.random(len(rows)) > prob
+
+    def _draw(self, rvars, codes):
+        values = np.empty(len(codes))
+        for code in np.unique(codes):
+            mask = codes == code
+            values[mask] = rvars[code].draw(np.count_nonzero(mask), self.rng)
+
+        return values
+
+    def to_dataframe(self, simulation_offset=0):
+        mask = np.arange(self.capacity) < self.n_clients[:, None]
+        simulation = np.broadcast_to(
+            np.arange(self.n)[:, None] + simulation_offset, mask.shape
+        )
+        requirement = self.client_requirement[mask].astype(float)
+        requirement[requirement == 0] = np.nan
+
+        return pd.DataFrame({
+            "simulation": simulation[mask],
+            "type": np.array([t.name for t in TYPES])[self.client_type[mask]],
+            "arrive_time": self.arrive_time[mask],
+            "requirement": requirement,
+            "waiting_room_arrive_time": self.waiting_room_arrive_time[mask],
+            "ticker": self.client_ticker[mask],
+            "attention_start_time": self.attention_start_time[mask],
+            "price": self.price[mask],
+            "leave_time": self.leave_time[mask],
+            "leakage_time": self.leakage_time[mask],
+            "worker_helper": self.worker_helper[mask],
+        })
+
+
+def compare(n, workers_factory, waiting_room_size=20, seed=0):
+    """
+    Statistical equivalence of the two engines: n replications of each, the
+    KPIs of kpis.py for every replication, and for every KPI the p-values
+    of a Welch t-test on the means and a Kolmogorov-Smirnov test on the
+    distributions.
+    """
+    from scipy import stats
+
+    # kpis.py lives at the repository root, run from there
+    from kpis import prepare_data, compute_kpis
+
+    try:
+        from simulation import Simulation
+        from entities.totem import Totem
+    except ModuleNotFoundError:
+        from src.simulation import Simulation
+        from src.entities.totem import Totem
+
+    reference = []
+    for i in range(n):
+        ClientRandomVar.seed(seed, i)
+        s = Simulation(
+            waiting_room_size=waiting_room_size,
+            totem=Totem(),
+            workers=workers_factory()
+        ).start().run()
+        df = pd.DataFrame([c.to_dict(simulation=i) for c in s.clients])
+        reference.append(compute_kpis(prepare_data(df)))
+
+    vectorized = VectorizedSimulation(
+        n, waiting_room_size, workers_factory(), seed=seed
+    ).start().run().to_dataframe()
+    vectorized = [
+        compute_kpis(prepare_data(df.reset_index(drop=True)))
+        for _, df in vectorized.groupby('simulation')
+    ]
+
+    reference, vectorized = pd.DataFrame(reference), pd.DataFrame(vectorized)
+
+    rows = []
+    for kpi in reference.columns:
+        a, b = reference[kpi].dropna(), vectorized[kpi].dropna()
+        rows.append({
+            "kpi": kpi,
+            "reference": a.mean(),
+            "vectorized": b.mean(),
+            "welch_p": stats.ttest_ind(a, b, equal_var=False).pvalue,
+            "ks_p": stats.ks_2samp(a, b).pvalue,
+        })
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=200)
+    parser.add_argument("--q_len", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--alpha", type=float, default=0.01)
+
+    args = parser.parse_args()
+
+    def workers():
+        return [
+            Seller(12, queue_len=args.q_len),
+            ClientSupport(12.5, queue_len=args.q_len),
+            Seller(13, queue_len=args.q_len),
+            ClientSupport(13.5, queue_len=args.q_len)
+        ]
+
+    report = compare(args.n, workers, seed=args.seed)
+    print(report.to_string())
+
+    # Bonferroni correction over the KPIs
+    alpha = args.alpha / len(report)
+    failed = report[(report['welch_p'] < alpha) | (report['ks_p'] < alpha)]
+    print("OK" if failed.empty else f"DIFFERENT: {list(failed['kpi'])}")
@@ -0,0 +1,36 @@
+import json
+import hashlib
+
+import pytest
+
+from src.simulation import Simulation, LeakageModel
+from src.entities.totem import Totem
+from src.random_vars import client as ClientRandomVar
+
+from tests.test_reset import OFFICES, SEED
+
+# md5 of the client tables of 3 seeded replications of every office, taken
+# before the table-driven event dispatch. Every calendar runs the same events
+GOLDEN = {
+    LeakageModel.POLLING: '1bea3442d3e7d04cb35dbe8949d1398d',
+    LeakageModel.SCHEDULED: 'b6db501704c31de9b9503f3db3e9d5de',
+}
+
+
+@pytest.mark.parametrize('calendar', ['heap', 'calendar', 'ladder'])
+@pytest.mark.parametrize('leakage', list(GOLDEN))
+def test_client_tables_are_unchanged(calendar, leakage):
+    digest = hashlib.md5()
+
+    for workers in OFFICES.values():
+        for replication in range(3):
+            ClientRandomVar.seed(SEED, replication)
+            simulation = Simulation(
+                20, Totem(), workers(), calendar=calendar, leakage=leakage
+            ).start().run(testing=True)
+
+            digest.update(json.dumps(
+                [client.to_dict() for client in simulation.clients], default=float
+            ).encode())
+
+    assert digest.hexdigest() == GOLDEN[leakage]
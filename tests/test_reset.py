@@ -0,0 +1,52 @@
+import numpy as np
+
+from src.simulation import Simulation
+from src.entities.totem import Totem
+from src.entities.workers import Seller, ClientSupport, SellerAndClientSupport
+from src.random_vars import client as ClientRandomVar
+from src.runner.scheduler import ReplicationScheduler
+
+SEED = 123456
+
+OFFICES = {
+    'default': lambda: [Seller(12), ClientSupport(12.5), Seller(13), ClientSupport(13.5)],
+    'q0': lambda: [
+        Seller(12, queue_len=0), ClientSupport(12.5, queue_len=0),
+        Seller(13, queue_len=0), ClientSupport(13.5, queue_len=0)
+    ],
+    'mixed': lambda: [SellerAndClientSupport(12), Seller(13), ClientSupport(13.5)],
+}
+
+
+def clients(simulation, replication):
+    ClientRandomVar.seed(SEED, replication)
+    simulation.reset().start().run(testing=True)
+    return [client.to_dict() for client in simulation.clients]
+
+
+def test_reset_simulation_equals_fresh_one():
+    for name, workers in OFFICES.items():
+        reused = Simulation(20, Totem(), workers())
+
+        for replication in range(5):
+            fresh = Simulation(20, Totem(), workers())
+            assert clients(reused, replication) == clients(fresh, replication), \
+                (name, replication)
+
+
+def test_scheduler_ranges_equal_sequential_runs():
+    workers = OFFICES['default']
+
+    def records(chunk_size):
+        with ReplicationScheduler(
+            workers(), chunk_size=chunk_size, processes=1, seed=SEED
+        ) as scheduler:
+            ranges = sorted(scheduler.run(6), key=lambda result: result[0])
+            return np.concatenate([records for _, _, records in ranges])
+
+    one, three = records(1), records(3)
+    assert one.tobytes() == three.tobytes()
+
+    simulation = Simulation(20, Totem(), workers())
+    expected = sum(len(clients(simulation, i)) for i in range(6))
+    assert len(one) == expected
@@ -0,0 +1,18 @@
+import pytest
+
+from src.runner.sweep import point, grid, latin_hypercube, workers
+
+
+def test_points_without_a_worker_for_a_requirement_are_rejected():
+    with pytest.raises(ValueError):
+        point(sellers=0)
+    with pytest.raises(ValueError):
+        point(client_supports=0)
+    with pytest.raises(ValueError):
+        grid({'sellers': [0, 1]})
+    with pytest.raises(ValueError):
+        latin_hypercube({'sellers': [0, 3]}, 10)
+
+    # Sellers and client supports attend every requirement
+    assert len(workers(point(sellers=0, client_supports=0, sellers_and_client_supports=1))) == 1
+    assert len(latin_hypercube({'sellers': [1, 3]}, 10)) == 10
@@ -0,0 +1,16 @@
+from src.vectorized import compare
+from src.entities.workers import Seller, ClientSupport
+
+
+def workers():
+    return [Seller(12), ClientSupport(12.5), Seller(13), ClientSupport(13.5)]
+
+
+def test_vectorized_equivalent_to_event_engine():
+    # Fixed seed, so the check is deterministic, Bonferroni corrected over
+    # the KPIs as in `python -m src.vectorized`
+    report = compare(60, workers, seed=0)
+    alpha = 0.01 / len(report)
+
+    failed = report[(report['welch_p'] < alpha) | (report['ks_p'] < alpha)]
+    assert failed.empty, failed.to_string()